@@ -0,0 +1,44 @@
+"""
+Benchmark suite of every simulator and engine - wall time, peak RSS and peak allocations, with comparison against a stored baseline.
+
+Run from the repository root:
+    python -m benchmarks --save baseline.json                     # record a baseline
+    python -m benchmarks --compare baseline.json                  # exit status 1 upon regressions
+    python -m benchmarks -k monte_carlo_simulation --maximum-paths 100000
+"""
+import argparse
+import sys
+
+from .harness import DEFAULT_TOLERANCE, compare, load_results, run_suite, save_results
+from .suite import PATHS, benchmarks
+
+
+def main(arguments=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__.strip().splitlines()[0])
+    parser.add_argument("-k", "--keyword", help="only run cases whose name contains KEYWORD")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per case (default 3)")
+    parser.add_argument("--maximum-paths", type=int, default=PATHS[-1], help=f"largest number of paths (default {PATHS[-1]})")
+    parser.add_argument("--save", metavar="FILE", help="store the results (ie. as a baseline)")
+    parser.add_argument("--compare", metavar="FILE", help="compare the results against a stored baseline")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help=f"relative slowdown / allocation growth reported as a regression (default {DEFAULT_TOLERANCE})")
+    arguments = parser.parse_args(arguments)
+
+    print(f"{'case':<80} {'wall time':>10} {'peak RSS':>11} {'allocated':>11}")
+    results = run_suite(benchmarks(arguments.maximum_paths), repeat=arguments.repeat, keyword=arguments.keyword)
+
+    if arguments.save:
+        save_results(arguments.save, results)
+
+    if arguments.compare:
+        regressions = compare(results, load_results(arguments.compare), arguments.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            return 1
+        print(f"No regressions against {arguments.compare}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
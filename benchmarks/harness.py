@@ -0,0 +1,152 @@
+"""
+Measurement, storage and baseline comparison of benchmark cases.
+
+Each case is measured for wall time (best and median of `repeat` runs), peak resident set size (RSS) above the RSS before the
+case, and peak bytes allocated (traced by `tracemalloc`, upon a separate run - NumPy reports its array allocations to it).
+"""
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from statistics import median
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional
+
+import numpy as np
+
+# Default relative slowdown / growth beyond the baseline reported as a regression:
+DEFAULT_TOLERANCE = 0.2
+
+# Metrics compared against the baseline:
+COMPARED_METRICS = ("wall_time", "peak_allocated")
+
+
+class Benchmark(NamedTuple):
+    # `setup()` prepares the (untimed) inputs passed to the timed `run(inputs)`:
+    name: str
+    setup: Callable
+    run: Callable
+
+
+def _resident_set_size(field: str) -> Optional[int]:
+    # Current (VmRSS) or peak (VmHWM) resident set size in bytes - Linux only:
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def _reset_peak_resident_set_size() -> bool:
+    # Writing 5 to clear_refs resets the peak RSS to the current RSS (Linux 4.0+):
+    try:
+        with open("/proc/self/clear_refs", "w") as clear_refs:
+            clear_refs.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def measure(benchmark: Benchmark, repeat: int = 3) -> Dict[str, float]:
+    """
+    Wall time, peak RSS and peak allocations of a benchmark case.
+    """
+    inputs = benchmark.setup()
+
+    # Wall time and peak RSS:
+    resident = _resident_set_size("VmRSS")
+    peak_rss = None
+    timings = []
+    for _ in range(repeat):
+        reset = _reset_peak_resident_set_size()
+        start = time.perf_counter()
+        benchmark.run(inputs)
+        timings.append(time.perf_counter() - start)
+        peak = _resident_set_size("VmHWM")
+        if reset and peak is not None and resident is not None:
+            peak_rss = max(peak_rss or 0, peak - resident)
+
+    # Peak allocations:
+    tracemalloc.start()
+    try:
+        benchmark.run(inputs)
+        _, peak_allocated = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "wall_time": min(timings),
+        "median_wall_time": median(timings),
+        "peak_rss": peak_rss,
+        "peak_allocated": peak_allocated,
+    }
+
+
+def environment() -> Dict[str, str]:
+    """
+    Versions and platform of a benchmark run - results are only comparable within the same environment.
+    """
+    return {
+        "python": sys.version.split()[0],
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "cpu_count": str(os.cpu_count()),
+    }
+
+
+def run_suite(
+        benchmarks: Iterable[Benchmark],
+        repeat: int = 3,
+        keyword: Optional[str] = None,
+        stream=sys.stdout,
+) -> Dict[str, Dict[str, float]]:
+    """
+    Measure every benchmark whose name contains `keyword`, printing each result as it completes.
+    """
+    results = {}
+    for benchmark in benchmarks:
+        if keyword is not None and keyword not in benchmark.name:
+            continue
+        result = measure(benchmark, repeat)
+        results[benchmark.name] = result
+        rss = "n/a" if result["peak_rss"] is None else f"{result['peak_rss'] / 2 ** 20:9.1f}MB"
+        print(f"{benchmark.name:<80} {result['wall_time']:9.4f}s {rss:>11} {result['peak_allocated'] / 2 ** 20:9.1f}MB",
+              file=stream, flush=True)
+    return results
+
+
+def save_results(filename: str, results: Dict[str, Dict[str, float]]) -> None:
+    with open(filename, "w") as file:
+        json.dump({"environment": environment(), "results": results}, file, indent=2, sort_keys=True)
+
+
+def load_results(filename: str) -> Dict[str, Dict[str, float]]:
+    with open(filename) as file:
+        return json.load(file)["results"]
+
+
+def compare(
+        results: Dict[str, Dict[str, float]],
+        baseline: Dict[str, Dict[str, float]],
+        tolerance: float = DEFAULT_TOLERANCE,
+) -> List[str]:
+    """
+    Regressions of `results` against a stored `baseline` - wall time or peak allocations beyond (1 + `tolerance`) times the
+    baseline, for every case present in both.
+    """
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        for metric in COMPARED_METRICS:
+            value, reference = result.get(metric), baseline[name].get(metric)
+            if value is None or not reference:
+                continue
+            if value > (1 + tolerance) * reference:
+                regressions.append(f"{name}: {metric} {value:.6g} vs. baseline {reference:.6g} (+{value / reference - 1:.0%})")
+    return regressions
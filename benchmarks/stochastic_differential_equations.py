@@ -0,0 +1,117 @@
+"""
+Wall time of the stochastic differential equation simulators at 10^6 paths, against the per-step loop they replace.
+
+Run from the repository root:
+    python -m benchmarks.stochastic_differential_equations
+"""
+import time
+from math import ceil, log, sqrt
+
+import numpy as np
+
+from option_pricing.stochastic_differential_equations import (
+    geometric_brownian_motion,
+    geometric_ornstein_uhlenbeck,
+    inhomogeneous_geometric_brownian_motion,
+)
+
+NUMBER_SIMULATIONS = 10 ** 6
+TIME_STEP = 1 / 50
+
+##############################################################################
+########################## PER-STEP LOOP BASELINES: ##########################
+##############################################################################
+
+# The Euler schemes as previously implemented - a Python loop over time steps, with interleaved thetic / antithetic columns
+# updated through fancy indexing (the GOU loop with its shock and drift indices corrected, as it previously failed):
+
+
+def _antithetic_columns(n: int):
+    number_simulations = n + n % 2
+    simulated_value_columns = np.arange(0, number_simulations, 2)
+    return number_simulations, simulated_value_columns, simulated_value_columns + 1
+
+
+def per_step_geometric_ornstein_uhlenbeck(n, t, reversion_rate, sigma, equilibrium, risk_premium, S0, time_step):
+    risk_equilibrium = risk_premium / reversion_rate
+    number_simulated_steps = ceil(t / time_step)
+    number_simulations, simulated_value_columns, antithetic_value_columns = _antithetic_columns(n)
+    shock = np.random.normal(scale=sigma * sqrt(time_step), size=(number_simulated_steps, number_simulations // 2))
+
+    output = np.zeros((number_simulated_steps + 1, number_simulations))
+    output[0] = log(S0) - log(equilibrium)
+    for t in range(1, number_simulated_steps + 1):
+        drift = reversion_rate * (risk_equilibrium - output[t - 1]) * time_step
+        output[t, simulated_value_columns] = output[t - 1, simulated_value_columns] + \
+            drift[simulated_value_columns] + shock[t - 1]
+        output[t, antithetic_value_columns] = output[t - 1, antithetic_value_columns] + \
+            drift[antithetic_value_columns] - shock[t - 1]
+    return np.exp(output[:, :n] + log(equilibrium))
+
+
+def per_step_inhomogeneous_geometric_brownian_motion(n, t, reversion_rate, equilibrium, sigma, S0, time_step):
+    adjusted_risk = 0.5 * (sigma ** 2)
+    number_simulated_steps = ceil(t / time_step)
+    number_simulations, simulated_value_columns, antithetic_value_columns = _antithetic_columns(n)
+    shock = np.random.normal(scale=sigma * sqrt(time_step), size=(number_simulated_steps, number_simulations // 2))
+
+    output = np.zeros((number_simulated_steps + 1, number_simulations))
+    output[0] = log(S0)
+    for t in range(number_simulated_steps):
+        output_exp_t = np.exp(output[t])
+        drift = (reversion_rate * ((equilibrium - output_exp_t) / output_exp_t) - adjusted_risk) * time_step
+        output[t + 1, simulated_value_columns] = output[t, simulated_value_columns] + \
+            drift[simulated_value_columns] + shock[t]
+        output[t + 1, antithetic_value_columns] = output[t, antithetic_value_columns] + \
+            drift[antithetic_value_columns] - shock[t]
+    return np.exp(output[:, :n])
+
+##############################################################################
+################################ SIMULATORS: #################################
+##############################################################################
+
+
+GOU = dict(n=NUMBER_SIMULATIONS, t=1, reversion_rate=1.5, sigma=0.3, equilibrium=40, risk_premium=0.1, S0=36,
+           time_step=TIME_STEP)
+IGBM = dict(n=NUMBER_SIMULATIONS, t=1, reversion_rate=2, equilibrium=40, sigma=0.3, S0=36, time_step=TIME_STEP)
+
+# Name -> (simulator, per-step loop baseline or None):
+SIMULATORS = {
+    "geometric_brownian_motion": (lambda: geometric_brownian_motion(
+        n=NUMBER_SIMULATIONS, t=1, mu=0.06, sigma=0.2, S0=36, time_step=TIME_STEP), None),
+    "geometric_ornstein_uhlenbeck (euler)": (
+        lambda: geometric_ornstein_uhlenbeck(discretisation="euler", **GOU),
+        lambda: per_step_geometric_ornstein_uhlenbeck(**GOU)),
+    "geometric_ornstein_uhlenbeck (exact)": (
+        lambda: geometric_ornstein_uhlenbeck(discretisation="exact", **GOU), None),
+    "inhomogeneous_geometric_brownian_motion (euler)": (
+        lambda: inhomogeneous_geometric_brownian_motion(discretisation="euler", **IGBM),
+        lambda: per_step_inhomogeneous_geometric_brownian_motion(**IGBM)),
+    "inhomogeneous_geometric_brownian_motion (exact)": (
+        lambda: inhomogeneous_geometric_brownian_motion(discretisation="exact", **IGBM), None),
+}
+
+
+def _best_time(simulate, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        np.random.seed(0)
+        start = time.perf_counter()
+        simulate()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main(repeat: int = 3):
+    print(f"{'simulator':<50} {'wall time':>9} {'per-step':>9} {'speedup':>8}")
+    for name, (simulate, baseline) in SIMULATORS.items():
+        wall_time = _best_time(simulate, repeat)
+        if baseline is None:
+            print(f"{name:<50} {wall_time:8.3f}s")
+            continue
+        baseline_time = _best_time(baseline, repeat)
+        print(f"{name:<50} {wall_time:8.3f}s {baseline_time:8.3f}s {baseline_time / wall_time:7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
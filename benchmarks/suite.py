@@ -0,0 +1,191 @@
+"""
+Benchmark cases of every simulator and engine, across numbers of paths, time steps and state variables.
+
+Cases whose (paths x steps x state variables) exceed MAXIMUM_ELEMENTS are skipped to bound memory.
+"""
+from functools import partial
+from typing import List
+
+import numpy as np
+
+from option_pricing.american_options import binomial_option_pricing_model as american_binomial_option_pricing_model
+from option_pricing.american_options.monte_carlo_simulation import monte_carlo_simulation as american_monte_carlo_simulation
+from option_pricing.european_options import binomial_option_pricing_model as european_binomial_option_pricing_model
+from option_pricing.real_options.monte_carlo_simulation import monte_carlo_simulation as real_monte_carlo_simulation
+from option_pricing.stochastic_differential_equations import (
+    geometric_brownian_motion,
+    geometric_ornstein_uhlenbeck,
+    inhomogeneous_geometric_brownian_motion,
+)
+from option_pricing.utils import AmericanOption, LSMWorkspace, Orthogonals, RealOption, RegressionBasis, estimate_continuation_value
+
+from .harness import Benchmark
+
+# Grids:
+PATHS = (10 ** 4, 10 ** 5, 10 ** 6)
+SIMULATION_STEPS = (50, 250)
+ENGINE_STEPS = (50,)
+STATE_VARIABLES = (1, 3)
+DEGREES = (2, 4)
+LATTICE_STEPS = (100, 1000, 10000)
+LATTICE_METHODS = ("crr", "lr", "bbs", "bbsr")
+# Options of a vectorised option chain:
+CHAIN_SIZE = 1000
+CHAIN_STEPS = 500
+
+# Largest simulation (paths x steps x state variables) benchmarked:
+MAXIMUM_ELEMENTS = 5 * 10 ** 7
+
+# American put (Longstaff & Schwartz, 2001):
+S0, STRIKE_PRICE, RISK_FREE_RATE, SIGMA, MATURITY = 36, 40, 0.06, 0.2, 1
+
+
+def _none():
+    return None
+
+
+def _state_variables(number_simulations: int, number_steps: int, number_state_variables: int) -> np.ndarray:
+    # (steps + 1 x paths x state variables) GBM paths, one independent simulation per state variable:
+    return np.stack([
+        geometric_brownian_motion(n=number_simulations, t=MATURITY, mu=RISK_FREE_RATE, sigma=SIGMA, S0=S0,
+                                  time_step=MATURITY / number_steps, rng=seed)
+        for seed in range(number_state_variables)], axis=-1)
+
+
+def simulator_benchmarks(maximum_paths: int = PATHS[-1]) -> List[Benchmark]:
+    benchmarks = []
+    for number_simulations in (n for n in PATHS if n <= maximum_paths):
+        for number_steps in SIMULATION_STEPS:
+            if number_simulations * number_steps > MAXIMUM_ELEMENTS:
+                continue
+            common = dict(n=number_simulations, t=MATURITY, S0=S0, time_step=MATURITY / number_steps, rng=0)
+            suffix = f"paths={number_simulations} steps={number_steps}"
+            benchmarks.append(Benchmark(
+                f"geometric_brownian_motion {suffix}", _none,
+                lambda _, common=common: geometric_brownian_motion(mu=RISK_FREE_RATE, sigma=SIGMA, **common)))
+            for discretisation in ("euler", "exact"):
+                benchmarks.append(Benchmark(
+                    f"geometric_ornstein_uhlenbeck ({discretisation}) {suffix}", _none,
+                    lambda _, common=common, discretisation=discretisation: geometric_ornstein_uhlenbeck(
+                        reversion_rate=1.5, sigma=0.3, equilibrium=40, risk_premium=0.1, discretisation=discretisation,
+                        **common)))
+                benchmarks.append(Benchmark(
+                    f"inhomogeneous_geometric_brownian_motion ({discretisation}) {suffix}", _none,
+                    lambda _, common=common, discretisation=discretisation: inhomogeneous_geometric_brownian_motion(
+                        reversion_rate=2, equilibrium=40, sigma=0.3, discretisation=discretisation, **common)))
+    return benchmarks
+
+
+def _continuation_value_inputs(number_simulations: int, number_state_variables: int, orthogonal: str, degree: int):
+    rng = np.random.default_rng(0)
+    state_variables_t = S0 * np.exp(SIGMA * rng.standard_normal((number_simulations, number_state_variables)))
+    continuation_value = np.maximum(STRIKE_PRICE - state_variables_t[:, 0], 0) + rng.random(number_simulations)
+    in_the_money_paths = state_variables_t[:, 0] < STRIKE_PRICE
+    basis = RegressionBasis(orthogonal=orthogonal, degree=degree, cross_product=True)
+    workspace = LSMWorkspace(number_simulations, number_state_variables, basis.number_regressors(number_state_variables))
+    return dict(continuation_value=continuation_value, state_variables_t=state_variables_t, orthogonal=orthogonal,
+                degree=degree, cross_product=True, in_the_money_paths=in_the_money_paths, basis=basis, period=0,
+                workspace=workspace)
+
+
+def _estimate_continuation_value(inputs):
+    # The fitted values overwrite the in-the-money continuation values - regress upon a fresh copy each run:
+    return estimate_continuation_value(**dict(inputs, continuation_value=inputs["continuation_value"].copy()))
+
+
+def continuation_value_benchmarks(maximum_paths: int = PATHS[-1]) -> List[Benchmark]:
+    benchmarks = []
+    for number_simulations in (n for n in PATHS if n <= maximum_paths):
+        for number_state_variables in STATE_VARIABLES:
+            for orthogonal in (member.name for member in Orthogonals):
+                for degree in DEGREES:
+                    benchmarks.append(Benchmark(
+                        f"estimate_continuation_value {orthogonal.lower()} degree={degree} paths={number_simulations} "
+                        f"state_variables={number_state_variables}",
+                        partial(_continuation_value_inputs, number_simulations, number_state_variables, orthogonal, degree),
+                        _estimate_continuation_value))
+    return benchmarks
+
+
+def engine_benchmarks(maximum_paths: int = PATHS[-1]) -> List[Benchmark]:
+    benchmarks = []
+    for number_simulations in (n for n in PATHS if n <= maximum_paths):
+        for number_steps in ENGINE_STEPS:
+            for number_state_variables in STATE_VARIABLES:
+                if number_simulations * number_steps * number_state_variables > MAXIMUM_ELEMENTS:
+                    continue
+                setup = partial(_state_variables, number_simulations, number_steps, number_state_variables)
+                suffix = f"paths={number_simulations} steps={number_steps} state_variables={number_state_variables}"
+                benchmarks.append(Benchmark(
+                    f"american monte_carlo_simulation {suffix}", setup,
+                    lambda state_variables, number_steps=number_steps: american_monte_carlo_simulation(
+                        state_variables, state_variables[:, :, 0], STRIKE_PRICE, MATURITY / number_steps, RISK_FREE_RATE,
+                        call_option=False)))
+                benchmarks.append(Benchmark(
+                    f"real monte_carlo_simulation {suffix}", setup,
+                    lambda state_variables, number_steps=number_steps: real_monte_carlo_simulation(
+                        state_variables, state_variables[:, :, 0] - S0, 2, MATURITY / number_steps, RISK_FREE_RATE)))
+    return benchmarks
+
+
+def binomial_benchmarks() -> List[Benchmark]:
+    benchmarks = []
+    models = {"american": american_binomial_option_pricing_model, "european": european_binomial_option_pricing_model}
+    for option, model in models.items():
+        for method in LATTICE_METHODS:
+            for number_steps in LATTICE_STEPS:
+                benchmarks.append(Benchmark(
+                    f"{option} binomial_option_pricing_model {method} steps={number_steps}", _none,
+                    lambda _, model=model, method=method, number_steps=number_steps: model(
+                        RISK_FREE_RATE, MATURITY / number_steps, SIGMA, S0, STRIKE_PRICE, MATURITY, False, method)))
+            benchmarks.append(Benchmark(
+                f"{option} binomial_option_pricing_model {method} chain={CHAIN_SIZE} steps={CHAIN_STEPS}", _none,
+                lambda _, model=model, method=method: model(
+                    RISK_FREE_RATE, MATURITY / CHAIN_STEPS, SIGMA, S0, np.linspace(20, 60, CHAIN_SIZE), MATURITY, False,
+                    method)))
+    return benchmarks
+
+
+def _result_inputs(number_simulations: int, number_periods: int = ENGINE_STEPS[0] + 1):
+    rng = np.random.default_rng(0)
+    value = rng.random(number_simulations)
+    exercise_timings = np.where(rng.random(number_simulations) < 0.5, np.nan,
+                                rng.integers(0, number_periods, number_simulations)).astype(float)
+    net_cash_flow = rng.normal(0.5, 2, (number_periods, number_simulations))
+    profit = rng.normal(0, 1, (number_periods, number_simulations))
+    return dict(value=value, exercise_timings=exercise_timings, net_cash_flow=net_cash_flow, profit=profit,
+                number_simulations=number_simulations, number_periods=number_periods)
+
+
+def _american_option(inputs):
+    return AmericanOption(inputs["value"], inputs["number_simulations"], inputs["exercise_timings"], inputs["number_periods"],
+                          MATURITY / ENGINE_STEPS[0], call_option=False)
+
+
+def _real_option(inputs):
+    return RealOption(inputs["profit"], inputs["value"], inputs["exercise_timings"], inputs["net_cash_flow"], 3, 0,
+                      inputs["number_simulations"], inputs["number_periods"], MATURITY / ENGINE_STEPS[0])
+
+
+def _real_option_diagnostics(inputs):
+    # Construction and every lazily evaluated diagnostic:
+    result = _real_option(inputs)
+    return result.exercise_probability_cumulative, result.expected_payback
+
+
+def result_benchmarks(maximum_paths: int = PATHS[-1]) -> List[Benchmark]:
+    benchmarks = []
+    for number_simulations in (n for n in PATHS if n <= maximum_paths):
+        setup = partial(_result_inputs, number_simulations)
+        benchmarks.append(Benchmark(f"AmericanOption paths={number_simulations}", setup, _american_option))
+        benchmarks.append(Benchmark(f"RealOption paths={number_simulations}", setup, _real_option))
+        benchmarks.append(Benchmark(f"RealOption diagnostics paths={number_simulations}", setup, _real_option_diagnostics))
+    return benchmarks
+
+
+def benchmarks(maximum_paths: int = PATHS[-1]) -> List[Benchmark]:
+    """
+    Every benchmark case with at most `maximum_paths` simulated paths.
+    """
+    return (simulator_benchmarks(maximum_paths) + continuation_value_benchmarks(maximum_paths) + engine_benchmarks(maximum_paths)
+            + binomial_benchmarks() + result_benchmarks(maximum_paths))
@@ -3,8 +3,10 @@ from ._version import __version__
 
 from .binomial_option_pricing import binomial_option_pricing_model
 from .monte_carlo_simulation import monte_carlo_simulation
+from .batch_monte_carlo_simulation import batch_monte_carlo_simulation
 
 __all__ = [
     "binomial_option_pricing_model",
     "monte_carlo_simulation",
+    "batch_monte_carlo_simulation",
 ]
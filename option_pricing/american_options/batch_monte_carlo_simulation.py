@@ -0,0 +1,136 @@
+from numbers import Number
+from typing import List, Optional, Union
+
+import numpy as np
+
+# Requirements:
+from ..utils.continuation_value import RegressionBasis, stacked_least_squares
+from ..utils.discount import discount
+from ..utils.option_results import AmericanOption
+
+# __name__ = "option_pricing.american_options.batch_monte_carlo_simulation"
+
+
+def batch_monte_carlo_simulation(state_variables: np.ndarray,
+                                 payoff: np.ndarray,
+                                 strike_prices: Union[Number, np.ndarray],
+                                 time_step: Number,
+                                 risk_free_rate: Number,
+                                 call_options: Union[bool, np.ndarray] = True,
+                                 orthogonal: Optional[str] = "Power",
+                                 degree: Optional[int] = 2,
+                                 cross_product: Optional[bool] = True,
+                                 ) -> List[AmericanOption]:
+    """
+    Price a ladder of American options written on the same simulated underlying through Least-Squares Monte Carlo.
+
+    All contracts share `state_variables` and `payoff`; `strike_prices` and `call_options` are broadcast against one another.
+    The regression matrix is evaluated once per period and every contract's least-squares system is solved in a single stacked solve.
+    Returns one `AmericanOption` per contract, in the order of `strike_prices`.
+    """
+
+    # State variables must be coerced as a 3-d array:
+    if state_variables.ndim < 3:
+        state_variables = state_variables.reshape(state_variables.shape + (1,))
+
+    # Const:
+    number_periods, number_simulations, number_state_variables = state_variables.shape
+
+    # Contracts:
+    strike_prices, call_options = np.broadcast_arrays(
+        np.atleast_1d(np.asarray(strike_prices, dtype=float)),
+        np.atleast_1d(np.asarray(call_options, dtype=bool)))
+    assert strike_prices.ndim == 1, "'strike_prices' and 'call_options' must be 1-d"
+
+    # Nominal interest rate:
+    nominal_interest_rate = risk_free_rate * time_step
+    # Corresponding discount:
+    discount_rate = discount(nominal_interest_rate)
+
+    # Time period of backwards induction:
+    termination_period = number_periods - 1
+
+    # Assertions:
+    assert not np.isnan(state_variables).any(
+    ), "NA's cannot be specified within 'state_variables'"
+    assert number_periods == payoff.shape[0] and number_simulations == payoff.shape[
+        1], "The first 2 dimensions of 'state_variables' must match the dimensions of 'payoff'"
+
+    ##############################################################################
+    ################### Calculate Immediate Payoff (High Bias): ##################
+    ##############################################################################
+
+    # Calls profit from payoff - strike, puts from strike - payoff:
+    direction = np.where(call_options, 1.0, -1.0)[:, np.newaxis]
+    strikes = strike_prices[:, np.newaxis]
+
+    # Immediate payoff of exercise at time t, for every contract (contracts x simulations):
+    def profit_function(t):
+        return np.maximum(direction * (payoff[t, :] - strikes), 0)
+
+    ##############################################################################
+    ###################### Begin LSM Simulation Algorithm: #######################
+    ##############################################################################
+
+    # Would we exercise at option termination?
+    profit_t = profit_function(termination_period)
+    exercise = profit_t > 0
+
+    # Receive immediate profit if exercising:
+    american_option_value = np.where(exercise, profit_t, 0)
+
+    # Optimal period of exercise is the earliest time that exercise is triggered. If no exercise, an NA is returned:
+    exercise_timings = np.where(exercise, termination_period, np.nan)
+
+    # Regression basis, shared by all contracts:
+    basis = RegressionBasis(
+        orthogonal=orthogonal,
+        degree=degree,
+        cross_product=cross_product)
+
+    # Backwards induction begin:
+    for t in range(termination_period - 1, -1, -1):
+
+        # Immediate payoff of exercise:
+        profit_t = profit_function(t)
+
+        # We only consider the exercise / delay exercise decision for price paths that are in the money:
+        in_the_money_paths = profit_t > 0
+
+        # Expected value of waiting to exercise - Continuation value:
+        continuation_value = american_option_value * discount_rate
+
+        # Least-Squares regression (low bias), one shared regression matrix for all contracts:
+        if in_the_money_paths.any():
+            fitted_values = stacked_least_squares(
+                X=basis.evaluate(state_variables[t, :, :]),
+                weights=in_the_money_paths.astype(float),
+                y=continuation_value)
+            continuation_value = np.where(
+                in_the_money_paths, fitted_values, continuation_value)
+
+        # Dynamic programming:
+        exercise = profit_t > continuation_value
+
+        # Receive immediate profit if exercising, otherwise discount existing values:
+        american_option_value = np.where(
+            exercise, profit_t, american_option_value * discount_rate)
+
+        # Was the option exercised?
+        exercise_timings[exercise] = t
+
+    # End backwards induction.
+    american_option_value = american_option_value * discount_rate
+
+    # Evaluate outputs:
+    return [
+        AmericanOption(
+            american_option_value=american_option_value[contract],
+            number_simulations=number_simulations,
+            exercise_timings=exercise_timings[contract],
+            number_periods=number_periods,
+            time_step=time_step,
+            call_option=bool(call_options[contract])
+        )
+        for contract in range(len(strike_prices))
+    ]
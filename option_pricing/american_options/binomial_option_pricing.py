@@ -1,83 +1,42 @@
-
-from math import ceil, exp, sqrt
+from numbers import Number
+from typing import Union
 
 import numpy as np
 
-# Discount Factor:
-from ..utils.discount import discount
+# Binomial lattice:
+from ..utils.lattice import ArrayLike, binomial_lattice
 
 # __name__ = 'option_pricing.american_options.binomial_option_pricing'
 
 
-# Functions for probabilities & tree prices:
-
 def binomial_option_pricing_model(
-    r,
-    time_step,
-    sigma,
-    stock_price,
-    strike_price,
-    n,
-    call_option=True
-):
-
-    # Discount / premium rate between discrete steps:
-    discount_rate = discount(r, time_step)
-    premium_rate = discount(-r, time_step)
-
-    # Number of Discrete time steps:
-    number_periods = n / time_step
-    # Total Periods evaluated (int):
-    total_periods = ceil(number_periods)
-
-    # Associated matrices shape:
-    out_shape = (total_periods, total_periods)
-
-    # Risk Neutral Probabilites:
-    prob_up = exp(sigma * sqrt(time_step))
-    prob_down = exp(-sigma * sqrt(time_step))
-
-    # Discount likelihood according to probabilities:
-    probability = (premium_rate-prob_down) / \
-        (prob_up-prob_down) if prob_up-prob_down != 0 else 1
-    q_probability = 1 - probability
-
-    # Sparse / Diagonal tree of probabilities:
-    potential_stock_prices = np.zeros(out_shape)
-
-    # Calculate Cumulative Binomial Tree probabilities:
-    for index, time in zip(range(total_periods), range(1, total_periods+1)):
-        cols = np.arange(start=1, stop=time+1)
-
-        # Probabilities:
-        down = prob_down ** (time - cols)
-        up = prob_up ** (cols - 1)
-
-        potential_stock_prices[index, :time] = up * down
-    # Stock Price Tree:
-    potential_stock_prices *= stock_price
-
-    # terminal_stock_prices = stock_price * prob_down ** (total_periods - cols) * prob_up ** (cols - 1)
-
-    # Safety:
-    # potential_stock_prices = np.maximum(potential_stock_prices, 0)
-
-    # Payoff / Decision tree:
-    option_tree = np.zeros(out_shape)
-
-    # Payoff calculation:
-    if call_option:
-        option_tree[-1,
-                    :] = np.maximum(potential_stock_prices[-1, :] - strike_price, 0)
-    else:
-        option_tree[-1, :] = np.maximum(strike_price -
-                                        potential_stock_prices[-1, :], 0)
-
-    # Recursive payoff calculation:
-    for i in range(len(option_tree) - 1, 0, -1):
-        option_tree[i-1, :i] = discount_rate * \
-            (probability * (option_tree[i, :i]) +
-             (q_probability * option_tree[i, 1:(i+1)]))
-
-    # Final calculation:
-    return discount_rate * (probability * (option_tree[1, 0]) + (q_probability * option_tree[1, 1]))
+    r: ArrayLike,
+    time_step: Number,
+    sigma: ArrayLike,
+    stock_price: ArrayLike,
+    strike_price: ArrayLike,
+    n: Number,
+    call_option: ArrayLike = True,
+    method: str = "crr"
+) -> Union[float, np.ndarray]:
+    """
+    Value American options with a binomial tree, exercising early wherever the immediate payoff exceeds
+    the value of waiting.
+
+    `n` is the option maturity (years), split into steps of length `time_step`. Memory is O(number of steps): a single value
+    vector is rolled back through the lattice. Arrays of `r`, `sigma`, `stock_price`, `strike_price` and `call_option` are
+    broadcast, valuing an option chain in one vectorised pass - an array of values of the broadcast shape is returned.
+
+    `method` selects the lattice: "crr" (Cox-Ross-Rubinstein), "lr" (Leisen-Reimer), "bbs" (Black-Scholes smoothing at the
+    penultimate step) or "bbsr" (BBS with Richardson extrapolation).
+    """
+    return binomial_lattice(
+        risk_free_rate=r,
+        time_step=time_step,
+        sigma=sigma,
+        stock_price=stock_price,
+        strike_price=strike_price,
+        n=n,
+        call_option=call_option,
+        early_exercise=True,
+        method=method)
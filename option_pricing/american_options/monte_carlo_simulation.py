@@ -1,12 +1,16 @@
 from numbers import Number
-from typing import Optional
+from typing import Callable, Optional, Union
 
 import numpy as np
 
 # Requirements:
-from ..utils.continuation_value import estimate_continuation_value
+from ..utils.backends import lsm_in_the_money_kernels
+from ..utils.continuation_value import RegressionBasis, estimate_in_the_money_continuation_value
 from ..utils.discount import discount
+from ..utils.workspace import LSMWorkspace
 from ..utils.option_results import AmericanOption
+from ..utils.trace import LSMTrace, get_trace
+from ..european_options.Black_Scholes_Merton import black_scholes_merton
 
 # __name__ = "option_pricing.american_options.monte_carlo_simulation"
 
@@ -20,7 +24,40 @@ def monte_carlo_simulation(state_variables: np.ndarray,
                            orthogonal: Optional[str] = "Power",
                            degree: Optional[int] = 2,
                            cross_product: Optional[bool] = True,
+                           solver: Optional[str] = "svd",
+                           workspace: Optional[LSMWorkspace] = None,
+                           backend: Optional[str] = "numpy",
+                           dtype: Optional[np.dtype] = np.float64,
+                           control_variate: Optional[bool] = False,
+                           sigma: Optional[Number] = None,
+                           european_option_price: Optional[Number] = None,
+                           trace: Optional[Union[bool, Callable, LSMTrace]] = None,
                            ):
+    """
+    Value an American option through Least-Squares Monte Carlo (LSM) simulation.
+
+    `state_variables` and `payoff` are only read one time slice at a time, so path cubes memory mapped from a path store
+    (`option_pricing.utils.load_paths`) are priced without being loaded into memory.
+
+    With `control_variate`, the European option on the same paths is used as a control variate. Given the volatility `sigma`
+    of the underlying, the control is the discounted Black-Scholes-Merton value of the European option at each path's
+    exercise time (a martingale, with mean equal to the European value at time zero). As the exercise rule is estimated upon
+    the same paths, its foresight biases this control in small samples (of order 1 / number of simulations). Otherwise, the
+    control is the discounted European payoff at maturity, of known value `european_option_price`. The adjusted price and
+    standard error are reported as `control_variate_option_price` and `control_variate_standard_error`.
+
+    With `trace` (True, a callback of each `PeriodTrace` or an `LSMTrace`), the wall time of each phase, in-the-money paths,
+    regression matrix shape and condition number of every period are recorded and returned as the `trace` of the result.
+    """
+
+    # Instrumentation - every hook is a no-op unless traced:
+    tracer = get_trace(trace)
+    tracer.start()
+
+    # Paths and payoffs may be memory mapped (ie. `load_paths`) - they are read, and cast to the working precision (float64 or
+    # float32) of the backwards induction, one time slice at a time:
+    state_variables = np.asanyarray(state_variables)
+    payoff = np.asanyarray(payoff)
 
     # State variables must be coerced as a 3-d array:
     if state_variables.ndim < 3:
@@ -44,8 +81,6 @@ def monte_carlo_simulation(state_variables: np.ndarray,
 
     # Assertions:
     # assert type(K) is Number and not len(K) == number_simulations, "length of object 'K' does not equal 1 or number of columns of 'state_variables'!"
-    assert not np.isnan(state_variables).any(
-    ), "NA's cannot be specified within 'state_variables'"
     assert number_periods == payoff.shape[0] and number_simulations == payoff.shape[
         1], "The first 2 dimensions of 'state_variables' must match the dimensions of 'payoff'"
 
@@ -55,82 +90,136 @@ def monte_carlo_simulation(state_variables: np.ndarray,
 
     # Payoff function:
     if call_option:
-        def profit_function(payoff, strike_price): return np.maximum(
-            payoff - strike_price, 0)
+        def profit_function(payoff, strike_price, out): return np.maximum(
+            np.subtract(payoff, strike_price, out=out), 0, out=out)
     else:
-        def profit_function(payoff, strike_price): return np.maximum(
-            strike_price - payoff, 0)
+        def profit_function(payoff, strike_price, out): return np.maximum(
+            np.subtract(strike_price, payoff, out=out), 0, out=out)
 
-    # Forward insight (high bias) - the immediate payoff of exercise at any time point and simulated payoff path:
-    profit = profit_function(payoff, strike_price)
+    # Forward insight (high bias) - the immediate payoff of exercise at each time point and simulated payoff path, evaluated
+    # per period:
+    terminal_profit = profit_function(payoff[-1], strike_price, np.empty(number_simulations, dtype=dtype))
+    profit_t = np.empty(number_simulations, dtype=dtype)
+    tracer.mark("payoff")
 
     ##############################################################################
     ###################### Begin LSM Simulation Algorithm: #######################
     ##############################################################################
 
     # American option value of project, given that you can either delay or exercise:
-    american_option_value = np.zeros(shape=number_simulations)
+    american_option_value = np.zeros(shape=number_simulations, dtype=dtype)
 
     # Optimal period of exercise is the earliest time that exercise is triggered. If no exercise, an NA is returned:
     exercise_timings = np.full(shape=number_simulations, fill_value=np.nan)
 
     # Would we exercise at option termination?
-    exercise = profit[-1,] > 0
+    exercise = terminal_profit > 0
 
     # Receive immediate profit if exercising:
-    american_option_value[exercise] = profit[-1, exercise]
+    american_option_value[exercise] = terminal_profit[exercise]
 
     # Was the option exercised?
     exercise_timings[exercise] = termination_period
 
+    # Regression basis, evaluated once per period:
+    basis = RegressionBasis(
+        orthogonal=orthogonal,
+        degree=degree,
+        cross_product=cross_product)
+
+    # Preallocated buffers of the backwards induction, reused at every period:
+    if workspace is None:
+        workspace = LSMWorkspace()
+    workspace.reserve(number_simulations, number_state_variables,
+                      basis.number_regressors(number_state_variables), dtype=dtype)
+    in_the_money_paths = workspace.in_the_money_paths[:number_simulations]
+    path_index = workspace.path_index[:number_simulations]
+    in_the_money_index = workspace.in_the_money_index[:number_simulations]
+    continuation_value_in_the_money = workspace.continuation_value_in_the_money[:number_simulations]
+
+    # Per-period kernels upon compacted in-the-money paths - fused and parallel when the "numba" backend is available:
+    in_the_money_kernel, exercise_kernel = lsm_in_the_money_kernels(backend)
+
     # American Options hold value in waiting:
     # Backwards induction begin:
     # t = termination_period - 1
     for t in range(termination_period - 1, -1, -1):
+        tracer.start_period(t)
 
         # Immediate payoff of exercise:
-        profit_t = profit[t, :]
-
-        # We only consider the exercise / delay exercise decision for price paths that are in the money (ie. profit from immediate exercise > 0):
-        state_variables_t = state_variables[t, :, :]
-        in_the_money_paths = profit_t > 0
-
-        # Expected value of waiting to exercise - Continuation value:
-        continuation_value = american_option_value * discount_rate
-
-        # Least-Squares regression (low bias) - compare expected value of waiting against the value of immediate exercise:
-        if in_the_money_paths.any():
-            continuation_value = estimate_continuation_value(
-                in_the_money_paths=in_the_money_paths,
-                continuation_value=continuation_value,
-                state_variables_t=state_variables_t,
-                orthogonal=orthogonal,
-                degree=degree,
-                cross_product=cross_product)
-
-        # Dynamic programming:
-        exercise = profit_t > continuation_value
-
-        # Discount existing values if not exercising
-        american_option_value[~exercise] = american_option_value[~exercise] * discount_rate
-        # Receive immediate profit if exercising
-        american_option_value[exercise] = profit_t[exercise]
-
-        # Was the option exercised?
-        exercise_timings[exercise] = t
+        profit_function(payoff[t], strike_price, profit_t)
+        tracer.mark("payoff")
+
+        # Expected value of waiting to exercise - discount existing values of every path (a single pass), compacting the index and
+        # continuation value of the in-the-money paths:
+        number_in_the_money = in_the_money_kernel(
+            profit_t, american_option_value, discount_rate, in_the_money_index, continuation_value_in_the_money,
+            in_the_money_paths, path_index)
+        tracer.mark("in_the_money")
+
+        # Least-Squares regression (low bias) - compare expected value of waiting against the value of immediate exercise. We only
+        # consider the exercise / delay exercise decision for price paths that are in the money (ie. profit from immediate
+        # exercise > 0) - only their state variables are read, cast and checked for NA's:
+        if number_in_the_money > 0:
+            fitted_values = estimate_in_the_money_continuation_value(
+                continuation_value_in_the_money=continuation_value_in_the_money[:number_in_the_money],
+                state_variables_t=state_variables[t, :, :],
+                in_the_money_index=in_the_money_index[:number_in_the_money],
+                basis=basis,
+                workspace=workspace,
+                solver=solver,
+                period=t,
+                trace=tracer)
+
+            # Dynamic programming - exercise in-the-money paths of greater immediate profit than continuation value:
+            exercise_kernel(profit_t, fitted_values, american_option_value, exercise_timings,
+                            in_the_money_index[:number_in_the_money], t,
+                            workspace.profit_in_the_money, workspace.exercise, workspace.exercised_index)
+            tracer.mark("exercise")
+        tracer.end_period(number_in_the_money)
 
         # Re-iterate.
     # End backwards induction.
 
     # TODO: One more required?
-    american_option_value = american_option_value * discount_rate
+    # Results are reported in float64, regardless of the working precision:
+    american_option_value = american_option_value.astype(np.float64) * discount_rate
+
+    # Control variate - the European option on the same paths, of known value:
+    european_option_value = None
+    if control_variate:
+        maturity = termination_period * time_step
+        if sigma is not None:
+            if european_option_price is None:
+                european_option_price = black_scholes_merton(
+                    float(np.mean(payoff[0])), strike_price, risk_free_rate, sigma, maturity, call_option)
+            # The discounted European value is a martingale - its value at the (LSM) stopping time has the same known mean,
+            # and is far more correlated with the American value than the terminal payoff:
+            stopping_period = np.where(np.isnan(exercise_timings), termination_period, exercise_timings).astype(int)
+            european_option_value = terminal_profit.astype(np.float64)
+            before_maturity = np.flatnonzero(stopping_period < termination_period)
+            european_option_value[before_maturity] = black_scholes_merton(
+                payoff[stopping_period[before_maturity], before_maturity].astype(np.float64), strike_price, risk_free_rate,
+                sigma, (termination_period - stopping_period[before_maturity]) * time_step, call_option)
+            european_option_value *= np.exp(-risk_free_rate * time_step * stopping_period)
+        else:
+            assert european_option_price is not None, "'sigma' or 'european_option_price' must be specified for the control variate"
+            # Discounted European payoff at maturity:
+            european_option_value = terminal_profit.astype(np.float64) * discount(risk_free_rate, maturity)
+        tracer.mark("control_variate")
 
     # Evaluate outputs:
-    return AmericanOption(
+    result = AmericanOption(
         american_option_value=american_option_value,
         number_simulations=number_simulations,
         exercise_timings=exercise_timings,
         number_periods=number_periods,
         time_step=time_step,
-        call_option=call_option
+        call_option=call_option,
+        control_variate=european_option_value,
+        control_variate_mean=european_option_price
     )
+    tracer.mark("results")
+    tracer.finish()
+    result.trace = tracer if isinstance(tracer, LSMTrace) else None
+    return result
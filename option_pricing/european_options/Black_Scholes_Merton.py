@@ -1,6 +1,302 @@
+from numbers import Number
+from typing import Optional, Tuple, Union
+
+import numpy as np
+
+# Normal distribution:
+from ..utils.distributions import normal_cdf, normal_pdf
 
 # __name__ = 'option_pricing.european_options.Black_Scholes_Merton'
 
+ArrayLike = Union[Number, np.ndarray]
+
+# Implied volatility search:
+IMPLIED_VOLATILITY_TOLERANCE = 1e-12
+MAXIMUM_ITERATIONS = 100
+MAXIMUM_VOLATILITY = 10.0
+
+
+def _sign(call_option: ArrayLike) -> np.ndarray:
+    # sign = 1 (call) or -1 (put):
+    return np.where(call_option, 1.0, -1.0)
+
+
+def _output(out: Optional[np.ndarray], *arguments: ArrayLike) -> np.ndarray:
+    # The result buffer - `out`, otherwise a new array of the broadcast shape of the arguments:
+    return np.empty(np.broadcast(*arguments).shape) if out is None else out
+
+
+def _result(value: np.ndarray, out: Optional[np.ndarray]) -> Union[float, np.ndarray]:
+    # Scalar arguments return a float:
+    return float(value) if out is None and value.ndim == 0 else value
+
+
+def _d1(
+        stock_price: ArrayLike,
+        strike_price: ArrayLike,
+        risk_free_rate: ArrayLike,
+        sigma: ArrayLike,
+        maturity: ArrayLike,
+        out: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray]:
+    # d1 = (ln(S / K) + (r + sigma^2 / 2) T) / (sigma sqrt(T)), written into `out`, and the total volatility sigma sqrt(T):
+    volatility = np.multiply(sigma, np.sqrt(maturity))
+    np.divide(stock_price, strike_price, out=out)
+    np.log(out, out=out)
+    out += np.multiply(np.add(risk_free_rate, 0.5 * np.square(sigma)), maturity)
+    out /= volatility
+    return out, volatility
+
+
+def _discount_factor(risk_free_rate: ArrayLike, maturity: ArrayLike) -> np.ndarray:
+    # exp(-r T):
+    return np.exp(np.multiply(np.negative(risk_free_rate), maturity))
+
+
+def black_scholes_merton(
+        stock_price: ArrayLike,
+        strike_price: ArrayLike,
+        risk_free_rate: ArrayLike,
+        sigma: ArrayLike,
+        maturity: ArrayLike,
+        call_option: ArrayLike = True,
+        out: Optional[np.ndarray] = None,
+) -> Union[float, np.ndarray]:
+    """
+    Black-Scholes-Merton value of European options, sign (S N(sign d1) - K exp(-r T) N(sign d2)).
+
+    All arguments are broadcast together, valuing a whole option chain (strikes x maturities x spots) in a single vectorised
+    pass. Values are evaluated in place within `out` when supplied (of the broadcast shape) - the price requires a single
+    further temporary array, each Greek none.
+    """
+    value = _output(out, stock_price, strike_price, risk_free_rate, sigma, maturity, call_option)
+    sign = _sign(call_option)
+    d1, volatility = _d1(stock_price, strike_price, risk_free_rate, sigma, maturity, out=value)
+
+    # K exp(-r T) N(sign d2), with d2 = d1 - sigma sqrt(T):
+    strike_term = np.subtract(d1, volatility, out=np.empty(value.shape))
+    strike_term *= sign
+    normal_cdf(strike_term, out=strike_term)
+    strike_term *= np.multiply(strike_price, _discount_factor(risk_free_rate, maturity))
+
+    # S N(sign d1):
+    value *= sign
+    normal_cdf(value, out=value)
+    value *= stock_price
+
+    # sign (S N(sign d1) - K exp(-r T) N(sign d2)):
+    value -= strike_term
+    value *= sign
+    return _result(value, out)
+
+
+def black_scholes_merton_delta(
+        stock_price: ArrayLike,
+        strike_price: ArrayLike,
+        risk_free_rate: ArrayLike,
+        sigma: ArrayLike,
+        maturity: ArrayLike,
+        call_option: ArrayLike = True,
+        out: Optional[np.ndarray] = None,
+) -> Union[float, np.ndarray]:
+    """
+    Sensitivity of the option value to the spot price, sign N(sign d1).
+    """
+    value = _output(out, stock_price, strike_price, risk_free_rate, sigma, maturity, call_option)
+    sign = _sign(call_option)
+    _d1(stock_price, strike_price, risk_free_rate, sigma, maturity, out=value)
+    value *= sign
+    normal_cdf(value, out=value)
+    value *= sign
+    return _result(value, out)
+
+
+def black_scholes_merton_gamma(
+        stock_price: ArrayLike,
+        strike_price: ArrayLike,
+        risk_free_rate: ArrayLike,
+        sigma: ArrayLike,
+        maturity: ArrayLike,
+        call_option: ArrayLike = True,
+        out: Optional[np.ndarray] = None,
+) -> Union[float, np.ndarray]:
+    """
+    Second order sensitivity of the option value to the spot price, n(d1) / (S sigma sqrt(T)) - equal for calls and puts.
+    """
+    value = _output(out, stock_price, strike_price, risk_free_rate, sigma, maturity, call_option)
+    _, volatility = _d1(stock_price, strike_price, risk_free_rate, sigma, maturity, out=value)
+    normal_pdf(value, out=value)
+    value /= np.multiply(stock_price, volatility)
+    return _result(value, out)
+
+
+def black_scholes_merton_vega(
+        stock_price: ArrayLike,
+        strike_price: ArrayLike,
+        risk_free_rate: ArrayLike,
+        sigma: ArrayLike,
+        maturity: ArrayLike,
+        call_option: ArrayLike = True,
+        out: Optional[np.ndarray] = None,
+) -> Union[float, np.ndarray]:
+    """
+    Sensitivity of the option value to volatility, S n(d1) sqrt(T) - equal for calls and puts.
+    """
+    value = _output(out, stock_price, strike_price, risk_free_rate, sigma, maturity, call_option)
+    _d1(stock_price, strike_price, risk_free_rate, sigma, maturity, out=value)
+    normal_pdf(value, out=value)
+    value *= np.multiply(stock_price, np.sqrt(maturity))
+    return _result(value, out)
+
+
+def black_scholes_merton_theta(
+        stock_price: ArrayLike,
+        strike_price: ArrayLike,
+        risk_free_rate: ArrayLike,
+        sigma: ArrayLike,
+        maturity: ArrayLike,
+        call_option: ArrayLike = True,
+        out: Optional[np.ndarray] = None,
+) -> Union[float, np.ndarray]:
+    """
+    Sensitivity of the option value to the passage of time (per year), -S n(d1) sigma / (2 sqrt(T)) - sign r K exp(-r T) N(sign d2).
+    """
+    value = _output(out, stock_price, strike_price, risk_free_rate, sigma, maturity, call_option)
+    sign = _sign(call_option)
+    d1, volatility = _d1(stock_price, strike_price, risk_free_rate, sigma, maturity, out=value)
+
+    # sign r K exp(-r T) N(sign d2):
+    rate_term = np.subtract(d1, volatility, out=np.empty(value.shape))
+    rate_term *= sign
+    normal_cdf(rate_term, out=rate_term)
+    rate_term *= sign
+    rate_term *= np.multiply(np.multiply(risk_free_rate, strike_price), _discount_factor(risk_free_rate, maturity))
+
+    # -S n(d1) sigma / (2 sqrt(T)):
+    normal_pdf(value, out=value)
+    value *= np.multiply(stock_price, sigma)
+    value /= -2 * np.sqrt(maturity)
+
+    value -= rate_term
+    return _result(value, out)
+
+
+def black_scholes_merton_rho(
+        stock_price: ArrayLike,
+        strike_price: ArrayLike,
+        risk_free_rate: ArrayLike,
+        sigma: ArrayLike,
+        maturity: ArrayLike,
+        call_option: ArrayLike = True,
+        out: Optional[np.ndarray] = None,
+) -> Union[float, np.ndarray]:
+    """
+    Sensitivity of the option value to the risk-free rate, sign K T exp(-r T) N(sign d2).
+    """
+    value = _output(out, stock_price, strike_price, risk_free_rate, sigma, maturity, call_option)
+    sign = _sign(call_option)
+    _, volatility = _d1(stock_price, strike_price, risk_free_rate, sigma, maturity, out=value)
+    # d2 = d1 - sigma sqrt(T):
+    value -= volatility
+    value *= sign
+    normal_cdf(value, out=value)
+    value *= sign
+    value *= np.multiply(np.multiply(strike_price, maturity), _discount_factor(risk_free_rate, maturity))
+    return _result(value, out)
+
+
+def _normalised_black(x: np.ndarray, s: np.ndarray, sign: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    # Normalised Black price, sign (exp(x / 2) N(sign d1) - exp(-x / 2) N(sign d2)), and its derivative in s:
+    d1 = x / s + s / 2
+    d2 = d1 - s
+    price = sign * (np.exp(x / 2) * normal_cdf(sign * d1) - np.exp(-x / 2) * normal_cdf(sign * d2))
+    return price, np.exp(x / 2) * normal_pdf(d1)
+
+
+def implied_volatility(
+        option_price: ArrayLike,
+        stock_price: ArrayLike,
+        strike_price: ArrayLike,
+        risk_free_rate: ArrayLike,
+        maturity: ArrayLike,
+        call_option: ArrayLike = True,
+        tolerance: float = IMPLIED_VOLATILITY_TOLERANCE,
+        maximum_iterations: int = MAXIMUM_ITERATIONS,
+        out: Optional[np.ndarray] = None,
+) -> Union[float, np.ndarray]:
+    """
+    Black-Scholes-Merton implied volatility of European option prices.
+
+    Following Jaeckel, prices are normalised, b = price / (exp(-r T) sqrt(F K)) with x = ln(F / K), and in-the-money options
+    are reduced to out-of-the-money options through put-call parity. Newton iterations in the total volatility s = sigma sqrt(T)
+    start from the inflection point s = sqrt(2 |x|) of b - upon ln(b) below it, where b is convex, and upon b above it, where b
+    is concave - and are safeguarded by a bisection bracket. Prices outside of the no-arbitrage bounds return NaN. The whole
+    chain is iterated at once - only unconverged options are updated.
+    """
+    option_price, stock_price, strike_price, risk_free_rate, maturity, sign = (
+        np.asarray(x, dtype=float) for x in np.broadcast_arrays(
+            option_price, stock_price, strike_price, risk_free_rate, maturity, _sign(call_option)))
+    shape = option_price.shape
+    option_price, stock_price, strike_price, risk_free_rate, maturity, sign = (
+        x.ravel() for x in (option_price, stock_price, strike_price, risk_free_rate, maturity, sign))
+
+    # Normalised variables:
+    x = np.log(stock_price / strike_price) + risk_free_rate * maturity
+    normalised_price = option_price / (np.sqrt(stock_price * strike_price) * np.exp(-risk_free_rate * maturity / 2))
+
+    # Reduce in-the-money options to out-of-the-money options, b_call - b_put = exp(x / 2) - exp(-x / 2):
+    in_the_money = sign * x > 0
+    intrinsic_value = sign[in_the_money] * (np.exp(x[in_the_money] / 2) - np.exp(-x[in_the_money] / 2))
+    # Time values lost to rounding are treated as intrinsic:
+    time_value = normalised_price[in_the_money] - intrinsic_value
+    time_value[np.abs(time_value) <= 16 * np.finfo(float).eps * intrinsic_value] = 0
+    normalised_price[in_the_money] = time_value
+    sign = np.where(in_the_money, -sign, sign)
+
+    # Arbitrage-free prices only, 0 < b < exp(sign x / 2) - prices at intrinsic value imply zero volatility:
+    valid = (normalised_price > 0) & (normalised_price < np.exp(sign * x / 2)) & (maturity > 0)
+    intrinsic = (normalised_price == 0) & (maturity > 0)
+
+    # Initial guess (inflection point) and bracket of the total volatility:
+    total_volatility = np.sqrt(2 * np.abs(x))
+    lower_bound = np.zeros_like(x)
+    upper_bound = MAXIMUM_VOLATILITY * np.sqrt(maturity)
+    np.minimum(total_volatility, upper_bound, out=total_volatility)
+    total_volatility[~valid] = np.nan
+    total_volatility[intrinsic] = 0
+
+    # Convex (lower) branch - Newton iterations upon ln(b):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        inflection_price, _ = _normalised_black(x, total_volatility, sign)
+    lower_branch = normalised_price < inflection_price
+    with np.errstate(divide="ignore", invalid="ignore"):
+        log_normalised_price = np.log(normalised_price)
+
+    active = np.flatnonzero(valid)
+    for _ in range(maximum_iterations):
+        if active.size == 0:
+            break
+        s, x_a, sign_a, target = total_volatility[active], x[active], sign[active], normalised_price[active]
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            price, vega = _normalised_black(x_a, s, sign_a)
+
+        # Bracket update - prices are increasing in volatility:
+        above = price > target
+        upper_bound[active[above]] = s[above]
+        lower_bound[active[~above]] = s[~above]
+
+        # Newton step, bisection when leaving the bracket:
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            step = np.where(lower_branch[active],
+                            s - (np.log(price) - log_normalised_price[active]) * price / vega,
+                            s - (price - target) / vega)
+        outside = ~((step >= lower_bound[active]) & (step <= upper_bound[active]))
+        step[outside] = 0.5 * (lower_bound[active][outside] + upper_bound[active][outside])
+        total_volatility[active] = step
+
+        converged = np.abs(step - s) <= tolerance * np.maximum(s, 1)
+        active = active[~converged]
 
-def black_scholes_merton_partial_differential_equation():
-    pass
\ No newline at end of file
+    value = np.divide(total_volatility.reshape(shape), np.sqrt(maturity).reshape(shape), out=out)
+    return _result(value, out)
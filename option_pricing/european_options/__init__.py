@@ -1,9 +1,23 @@
-
-# from ._Black_Scholes_Merton import BSM_PDE
+from .Black_Scholes_Merton import (
+    black_scholes_merton,
+    black_scholes_merton_delta,
+    black_scholes_merton_gamma,
+    black_scholes_merton_rho,
+    black_scholes_merton_theta,
+    black_scholes_merton_vega,
+    implied_volatility,
+)
 from .binomial_option_pricing import binomial_option_pricing_model
 from .monte_carlo_simulation import monte_carlo_simulation
 
 __all__ = [
+    "black_scholes_merton",
+    "black_scholes_merton_delta",
+    "black_scholes_merton_gamma",
+    "black_scholes_merton_vega",
+    "black_scholes_merton_theta",
+    "black_scholes_merton_rho",
+    "implied_volatility",
     "binomial_option_pricing_model",
     "monte_carlo_simulation"
-]
\ No newline at end of file
+]
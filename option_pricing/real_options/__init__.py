@@ -1,2 +1,10 @@
 
-from ._version import __version__
\ No newline at end of file
+from ._version import __version__
+
+from .monte_carlo_simulation import monte_carlo_simulation
+from .portfolio_monte_carlo_simulation import portfolio_monte_carlo_simulation
+
+__all__ = [
+    "monte_carlo_simulation",
+    "portfolio_monte_carlo_simulation",
+]
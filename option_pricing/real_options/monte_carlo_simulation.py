@@ -1,16 +1,19 @@
 
 
 from numbers import Number
-from typing import Union
+from typing import Callable, Optional, Union
 
 import numpy as np
 
 __name__ = 'option_pricing.real_options.monte_carlo_simulation'
 
 # Requirements:
-from ..utils.continuation_value import estimate_continuation_value
-from ..utils.discount import discount, discount_array
+from ..utils.backends import lsm_in_the_money_kernels
+from ..utils.continuation_value import RegressionBasis, estimate_in_the_money_continuation_value
+from ..utils.discount import discount
+from ..utils.workspace import LSMWorkspace
 from ..utils.option_results import RealOption
+from ..utils.trace import LSMTrace, get_trace
 
 # Step 1 - Simulate asset prices:
 # state_variables = GBM(
@@ -34,17 +37,97 @@ from ..utils.option_results import RealOption
 # cross_product = True
 
 
+def _discount_rates(
+        risk_free_rate: Union[Number, np.ndarray],
+        time_step: Number,
+        number_periods: int,
+) -> np.ndarray:
+    # Discount of each period, from period t + 1 to t, of a constant rate or a curve of (number_periods - 1) rates:
+    nominal_interest_rate = np.asarray(risk_free_rate, dtype=float) * time_step
+    if nominal_interest_rate.ndim == 0:
+        return np.full(max(number_periods - 1, 0), discount(float(nominal_interest_rate)))
+    assert nominal_interest_rate.size == number_periods - 1, "a 'risk_free_rate' curve must have one rate per period (number_periods - 1)"
+    return np.exp(-nominal_interest_rate.reshape(-1))
+
+
+def _immediate_profit(
+        net_cash_flow: np.ndarray,
+        capital_expenditure: Union[Number, np.ndarray],
+        construction_periods: int,
+        discount_rates: np.ndarray,
+        dtype: np.dtype = np.float64,
+        out: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """
+    Immediate profit (high bias) of investing at each period and simulated path - the running present value of the net cash flows
+    from the completion of construction, less the capital expenditure.
+    """
+    number_periods, number_simulations = net_cash_flow.shape
+    termination_period = number_periods - 1
+
+    # Running Present Value (RPV) is the PV of all future net cash flows - a backward discounted cumulative sum, evaluated in place
+    # within the profit array:
+    profit = np.empty(shape=(number_periods, number_simulations), dtype=dtype) if out is None else out
+    running_present_value = profit
+    running_present_value[-1] = net_cash_flow[-1]
+    for t in range(termination_period - 1, -1, -1):
+        np.multiply(running_present_value[t + 1], discount_rates[t], out=running_present_value[t])
+        running_present_value[t] += net_cash_flow[t]
+    # TODO: RPV at terminal simulated price = 0? Assumption of if operating in this period or not?
+
+    # Immediate profit (high bias) is the net present value (NVP) conditional on:
+        # Expending Initial Capital Expenditure
+        # Waiting the construction period
+        # obtaining the RPV at the time point the project becomes operational.
+    if construction_periods > 0:
+        # Offset the running present value actually attained within the immediate profit by the number of periods to wait for
+        # construction to complete, further discounted over the construction period (rows are shifted in place, earliest first):
+        cumulative_discount = np.concatenate(([1.0], np.cumprod(discount_rates)))
+        for t in range(number_periods - construction_periods):
+            np.multiply(running_present_value[t + construction_periods],
+                        cumulative_discount[t + construction_periods] / cumulative_discount[t], out=profit[t])
+        profit[(number_periods - construction_periods):] = 0
+    # Subtract the capital expenditure (which may be time varying - one per period):
+    profit -= np.reshape(capital_expenditure, (-1, 1)) if np.ndim(capital_expenditure) > 0 else capital_expenditure
+
+    return profit
+
+
 def monte_carlo_simulation(
         state_variables: np.ndarray,
         net_cash_flow: np.ndarray,
         capital_expenditure: Union[Number, np.array],
         time_step: Number,
-        risk_free_rate: Number,
+        risk_free_rate: Union[Number, np.ndarray],
         construction_periods: int = 0,
         orthogonal: str = "Power",
         degree: int = 2,
         cross_product: bool = True,
+        solver: str = "svd",
+        workspace: Optional[LSMWorkspace] = None,
+        backend: str = "numpy",
+        dtype: np.dtype = np.float64,
+        trace: Optional[Union[bool, Callable, LSMTrace]] = None,
 ):
+    """
+    Value a real option (the option to invest in a project) through Least-Squares Monte Carlo (LSM) simulation.
+
+    `risk_free_rate` is a constant or a time varying discount curve - an array of (number_periods - 1) rates, the t'th applying
+    between periods t and t + 1. The running present value of future net cash flows is evaluated by a backward discounted cumulative
+    sum, RPV_t = NCF_t + d_t RPV_t+1, in O(number_periods x number_simulations).
+
+    With `trace` (True, a callback of each `PeriodTrace` or an `LSMTrace`), the wall time of each phase, in-the-money paths,
+    regression matrix shape and condition number of every period are recorded and returned as the `trace` of the result.
+    """
+
+    # Instrumentation - every hook is a no-op unless traced:
+    tracer = get_trace(trace)
+    tracer.start()
+
+    # Working precision (float64 or float32) of the simulated paths, cash flows and backwards induction - paths may be memory
+    # mapped (ie. `load_paths`) and are read, and cast, one time slice at a time:
+    state_variables = np.asanyarray(state_variables)
+    net_cash_flow = np.asanyarray(net_cash_flow)
 
     # State variables must be coerced as a 3-d array:
     if state_variables.ndim < 3:
@@ -58,10 +141,8 @@ def monte_carlo_simulation(
     # number_periods, number_simulations, number_state_variables = state_variables.shape
     number_periods, number_simulations, number_state_variables = state_variables.shape
 
-    # Nominal interest rate:
-    nominal_interest_rate = risk_free_rate * time_step
-    # Corresponding discount:
-    discount_rate = discount(nominal_interest_rate)
+    # Corresponding discount of each period, from period t + 1 to t:
+    discount_rates = _discount_rates(risk_free_rate, time_step, number_periods)
 
     # Time period of backwards induction:
     termination_period = number_periods - 1
@@ -70,9 +151,7 @@ def monte_carlo_simulation(
     # assert type(K) is Number and not len(K) == number_simulations, "length of object 'K' does not equal 1 or number of columns of 'state_variables'!"
     assert isinstance(construction_periods,
                       int), "'construction_periods' must be of type 'int'"
-    assert not np.isnan(state_variables).any(
-    ), "NA's cannot be specified within 'state_variables'"
-    assert type(capital_expenditure) is not np.array or len(capital_expenditure) == len(
+    assert np.ndim(capital_expenditure) == 0 or np.size(capital_expenditure) == len(
         net_cash_flow), "len(capital_expenditure) != len(net_cash_flow)"
     assert number_periods == net_cash_flow.shape[0] and number_simulations == net_cash_flow.shape[
         1], "The first 2 dimensions of 'state_variables' must match the dimensions of 'net_cash_flow'"
@@ -81,40 +160,15 @@ def monte_carlo_simulation(
     ################ Calculate Running Present Value (High Bias): ################
     ##############################################################################
 
-    # Array of subsequent discounting of cash flows:
-    discount_arr = discount_array(
-        nominal_interest_rate, np.array(range(number_periods)))
-
-    # Develop discount matrix:
-    discount_matrix = np.eye(number_periods)
-    diagonal = np.arange(0, number_periods)
-    for i in diagonal[1:]:
-        discount_matrix[diagonal[:-i] + i, diagonal[:-i]] = discount_arr[i]
-    # Running Present Value (RPV) is the PV of all future net cash flows:
-    running_present_value = (net_cash_flow.T @ discount_matrix).T
-    # TODO: RPV at terminal simulated price = 0? Assumption of if operating in this period or not?
-
-    # Further discount the Running Present Value based upon waiting for construction to complete:
-    if construction_periods > 0:
-        running_present_value *= discount_arr[construction_periods]
-
-    # Immediate profit (high bias) is the net present value (NVP) conditional on:
-        # Expending Initial Capital Expenditure
-        # Waiting the construction period
-        # obtaining the RPV at the time point the project becomes operational.
-    profit = np.zeros(shape=(number_periods, number_simulations))
-    # Offset the running present value actually attained within the immediate profit by the number of periods to wait for construction to complete:
-    profit[:(number_periods - construction_periods)
-           ] += running_present_value[construction_periods:number_periods]
-    # Subtract the capital expenditure (which may be time varying):
-    profit -= capital_expenditure
+    profit = _immediate_profit(net_cash_flow, capital_expenditure, construction_periods, discount_rates, dtype)
+    tracer.mark("immediate_profit")
 
     ##############################################################################
     ###################### Begin LSM Simulation Algorithm: #######################
     ##############################################################################
 
     # Real option value of the project, given that the option to invest is exercised at any time point.
-    real_option_value = np.zeros(shape=number_simulations)
+    real_option_value = np.zeros(shape=number_simulations, dtype=dtype)
 
     # Optimal period of exercise is the earliest time that exercise is triggered. If no exercise, an NA is returned:
     exercise_timings = np.full(shape=number_simulations, fill_value=np.nan)
@@ -128,41 +182,60 @@ def monte_carlo_simulation(
     # Was the option exercised?
     exercise_timings[exercise] = termination_period
 
+    # Regression basis, evaluated once per period:
+    basis = RegressionBasis(
+        orthogonal=orthogonal,
+        degree=degree,
+        cross_product=cross_product)
+
+    # Preallocated buffers of the backwards induction, reused at every period:
+    if workspace is None:
+        workspace = LSMWorkspace()
+    workspace.reserve(number_simulations, number_state_variables,
+                      basis.number_regressors(number_state_variables), dtype=dtype)
+    in_the_money_paths = workspace.in_the_money_paths[:number_simulations]
+    path_index = workspace.path_index[:number_simulations]
+    in_the_money_index = workspace.in_the_money_index[:number_simulations]
+    continuation_value_in_the_money = workspace.continuation_value_in_the_money[:number_simulations]
+
+    # Per-period kernels upon compacted in-the-money paths - fused and parallel when the "numba" backend is available:
+    in_the_money_kernel, exercise_kernel = lsm_in_the_money_kernels(backend)
+
     # American Options hold value in waiting:
     # Backwards induction begin:
     for t in range(termination_period - 1, -1, -1):
+        tracer.start_period(t)
 
         # Immediate payoff of exercise:
         profit_t = profit[t, :]
 
-        # We only consider the exercise / delay exercise decision for price paths that are in the money (ie. profit from immediate exercise > 0):
-        state_variables_t = state_variables[t, :, :]
-        in_the_money_paths = profit_t > 0
-
-        # Expected value of waiting to exercise - Continuation value:
-        continuation_value = real_option_value * discount_rate
-
-        # Least-Squares regression (low bias) - compare expected value of waiting against the value of immediate exercise:
-        if in_the_money_paths.any():
-            continuation_value = estimate_continuation_value(
-                in_the_money_paths=in_the_money_paths,
-                continuation_value=continuation_value,
-                state_variables_t=state_variables_t,
-                orthogonal=orthogonal,
-                degree=degree,
-                cross_product=cross_product)
-
-        # Dynamic programming:
-        exercise = profit_t > continuation_value
-
-        # Discount existing values if not exercising
-        real_option_value[~exercise] = real_option_value[~exercise] * \
-            discount_rate
-        # Receive immediate profit if exercising
-        real_option_value[exercise] = profit_t[exercise]
-
-        # Was the option exercised?
-        exercise_timings[exercise] = t
+        # Expected value of waiting to exercise - discount existing values of every path (a single pass), compacting the index and
+        # continuation value of the in-the-money paths:
+        number_in_the_money = in_the_money_kernel(
+            profit_t, real_option_value, discount_rates[t], in_the_money_index, continuation_value_in_the_money,
+            in_the_money_paths, path_index)
+        tracer.mark("in_the_money")
+
+        # Least-Squares regression (low bias) - compare expected value of waiting against the value of immediate exercise. We only
+        # consider the exercise / delay exercise decision for price paths that are in the money (ie. profit from immediate
+        # exercise > 0) - only their state variables are read, cast and checked for NA's:
+        if number_in_the_money > 0:
+            fitted_values = estimate_in_the_money_continuation_value(
+                continuation_value_in_the_money=continuation_value_in_the_money[:number_in_the_money],
+                state_variables_t=state_variables[t, :, :],
+                in_the_money_index=in_the_money_index[:number_in_the_money],
+                basis=basis,
+                workspace=workspace,
+                solver=solver,
+                period=t,
+                trace=tracer)
+
+            # Dynamic programming - exercise in-the-money paths of greater immediate profit than continuation value:
+            exercise_kernel(profit_t, fitted_values, real_option_value, exercise_timings,
+                            in_the_money_index[:number_in_the_money], t,
+                            workspace.profit_in_the_money, workspace.exercise, workspace.exercised_index)
+            tracer.mark("exercise")
+        tracer.end_period(number_in_the_money)
 
         # Re-iterate.
     # End backwards induction.
@@ -170,8 +243,11 @@ def monte_carlo_simulation(
     # TODO: One more required inconsistency between real_options and american_options?
     # real_option_value = real_option_value * discount_rate
 
+    # Results are reported in float64, regardless of the working precision:
+    real_option_value = real_option_value.astype(np.float64)
+
     # Evaluate outputs:
-    return RealOption(
+    result = RealOption(
         profit=profit,
         real_option_value=real_option_value,
         exercise_timings=exercise_timings,
@@ -180,5 +256,10 @@ def monte_carlo_simulation(
         construction_periods=construction_periods,
         number_simulations=number_simulations,
         number_periods=number_periods,
-        time_step=time_step
+        time_step=time_step,
+        backend=backend
     )
+    tracer.mark("results")
+    tracer.finish()
+    result.trace = tracer if isinstance(tracer, LSMTrace) else None
+    return result
@@ -0,0 +1,167 @@
+from numbers import Number
+from typing import List, Sequence, Union
+
+import numpy as np
+
+# Requirements:
+from ..utils.backends import lsm_kernels
+from ..utils.continuation_value import RegressionBasis, least_squares, stacked_least_squares
+from ..utils.option_results import RealOption
+from .monte_carlo_simulation import _discount_rates, _immediate_profit
+
+# __name__ = 'option_pricing.real_options.portfolio_monte_carlo_simulation'
+
+
+def _per_project(value, number_projects: int, name: str) -> list:
+    # A single value shared by all projects, otherwise one per project:
+    if isinstance(value, (Number, np.number)):
+        return [value] * number_projects
+    assert len(value) == number_projects, f"'{name}' must be a single value or one per project"
+    return list(value)
+
+
+def portfolio_monte_carlo_simulation(
+        state_variables: np.ndarray,
+        net_cash_flows: Union[Sequence[np.ndarray], np.ndarray],
+        capital_expenditures: Union[Number, Sequence],
+        time_step: Number,
+        risk_free_rate: Union[Number, np.ndarray],
+        construction_periods: Union[int, Sequence[int]] = 0,
+        orthogonal: str = "Power",
+        degree: int = 2,
+        cross_product: bool = True,
+        in_the_money_regression: bool = True,
+        solver: str = "svd",
+        backend: str = "numpy",
+        dtype: np.dtype = np.float64,
+) -> List[RealOption]:
+    """
+    Value a portfolio of real options (ie. an investment pipeline) whose projects share one simulation of `state_variables`.
+
+    Each project has its own `net_cash_flows` mapping (number_periods x number_simulations), capital expenditure (a constant or
+    one per period) and `construction_periods` - single values are shared by all projects. The regression basis is evaluated
+    once per period and shared by the backward inductions of every project. With `in_the_money_regression` each project regresses
+    upon its own in-the-money paths, as `monte_carlo_simulation`, through stacked normal equations sharing the per-path outer
+    products of the basis. Otherwise every project regresses upon all paths against a single factorisation (`solver`) of the
+    basis per period. Returns one `RealOption` per project, in order. Immediate profits of all projects are held in memory,
+    (projects x number_periods x number_simulations) in `dtype`.
+    """
+
+    # Paths may be memory mapped (ie. `load_paths`) and are read, and cast, one time slice at a time:
+    state_variables = np.asanyarray(state_variables)
+
+    # State variables must be coerced as a 3-d array:
+    if state_variables.ndim < 3:
+        state_variables = state_variables.reshape(state_variables.shape + (1,))
+
+    # Const:
+    number_periods, number_simulations, number_state_variables = state_variables.shape
+    number_projects = len(net_cash_flows)
+
+    # Projects:
+    net_cash_flows = [np.asanyarray(net_cash_flow) for net_cash_flow in net_cash_flows]
+    capital_expenditures = _per_project(capital_expenditures, number_projects, "capital_expenditures")
+    construction_periods = _per_project(construction_periods, number_projects, "construction_periods")
+
+    # Corresponding discount of each period, from period t + 1 to t:
+    discount_rates = _discount_rates(risk_free_rate, time_step, number_periods)
+
+    # Time period of backwards induction:
+    termination_period = number_periods - 1
+
+    # Assertions:
+    assert number_projects > 0, "At least one project must be specified within 'net_cash_flows'"
+    for net_cash_flow, capital_expenditure, construction_period in zip(net_cash_flows, capital_expenditures, construction_periods):
+        assert isinstance(construction_period, (int, np.integer)), "'construction_periods' must be of type 'int'"
+        assert np.ndim(capital_expenditure) == 0 or np.size(capital_expenditure) == number_periods, \
+            "len(capital_expenditure) != len(net_cash_flow)"
+        assert net_cash_flow.shape == (number_periods, number_simulations), \
+            "The first 2 dimensions of 'state_variables' must match the dimensions of every 'net_cash_flows'"
+
+    ##############################################################################
+    ############### Calculate Immediate Profit (High Bias) per Project: ##########
+    ##############################################################################
+
+    profit = np.empty(shape=(number_projects, number_periods, number_simulations), dtype=dtype)
+    for project in range(number_projects):
+        _immediate_profit(net_cash_flows[project], capital_expenditures[project], int(construction_periods[project]),
+                          discount_rates, dtype, out=profit[project])
+
+    ##############################################################################
+    ###################### Begin LSM Simulation Algorithm: #######################
+    ##############################################################################
+
+    # Real option value of each project, given that the option to invest is exercised at any time point:
+    real_option_value = np.zeros(shape=(number_projects, number_simulations), dtype=dtype)
+
+    # Optimal period of exercise is the earliest time that exercise is triggered. If no exercise, an NA is returned:
+    exercise_timings = np.full(shape=(number_projects, number_simulations), fill_value=np.nan)
+
+    # Would we exercise at option termination?
+    exercise = profit[:, -1] > 0
+
+    # Receive immediate profit if exercising:
+    real_option_value[exercise] = profit[:, -1][exercise]
+
+    # Was the option exercised?
+    exercise_timings[exercise] = termination_period
+
+    # Regression basis, shared by all projects:
+    basis = RegressionBasis(
+        orthogonal=orthogonal,
+        degree=degree,
+        cross_product=cross_product)
+
+    # Buffers of the backwards induction, reused at every period:
+    continuation_value = np.empty(shape=(number_projects, number_simulations), dtype=dtype)
+    in_the_money_paths = np.empty(shape=(number_projects, number_simulations), dtype=bool)
+
+    # Per-period kernels - fused and parallel when the "numba" backend is available:
+    continuation_kernel, exercise_kernel = lsm_kernels(backend)
+
+    # Backwards induction begin:
+    for t in range(termination_period - 1, -1, -1):
+
+        # Expected value of waiting to exercise - Continuation value of every project:
+        number_in_the_money = sum(
+            continuation_kernel(profit[project, t], real_option_value[project], discount_rates[t],
+                                continuation_value[project], in_the_money_paths[project])
+            for project in range(number_projects))
+
+        # Least-Squares regression (low bias) upon the shared regression matrix:
+        if number_in_the_money > 0:
+            state_variables_t = state_variables[t, :, :].astype(dtype, copy=False)
+            # NA's propagate through the minimum - a reduction, without a mask of every path:
+            assert not np.isnan(state_variables_t.min()), "NA's cannot be specified within 'state_variables'"
+            X = basis.evaluate(state_variables_t, parameters=basis.parameters(state_variables_t, period=t))
+
+            if in_the_money_regression:
+                fitted_values = stacked_least_squares(X, in_the_money_paths, continuation_value)
+            else:
+                fitted_values = (X @ least_squares(X, continuation_value.T, solver=solver)).T
+            np.copyto(continuation_value, fitted_values, where=in_the_money_paths)
+
+        # Dynamic programming - exercise, otherwise discount existing values:
+        for project in range(number_projects):
+            exercise_kernel(profit[project, t], continuation_value[project], real_option_value[project],
+                            exercise_timings[project], exercise[project], discount_rates[t], t)
+
+        # Re-iterate.
+    # End backwards induction.
+
+    # Evaluate outputs - results are reported in float64, regardless of the working precision:
+    return [
+        RealOption(
+            profit=profit[project],
+            real_option_value=real_option_value[project].astype(np.float64),
+            exercise_timings=exercise_timings[project],
+            net_cash_flow=net_cash_flows[project],
+            capital_expenditure=capital_expenditures[project],
+            construction_periods=int(construction_periods[project]),
+            number_simulations=number_simulations,
+            number_periods=number_periods,
+            time_step=time_step,
+            backend=backend
+        )
+        for project in range(number_projects)
+    ]
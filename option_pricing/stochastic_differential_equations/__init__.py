@@ -1,11 +1,17 @@
 
-from .geometric_brownian_motion import geometric_brownian_motion
+from .geometric_brownian_motion import (
+    geometric_brownian_motion,
+    geometric_brownian_motion_blocks,
+    geometric_brownian_motion_sobol,
+)
 from .inhomogeneous_geometric_brownian_motion import inhomogeneous_geometric_brownian_motion
 from .geometric_ornstein_uhlenbeck import geometric_ornstein_uhlenbeck
 from ._version import __version__
 
 __all__ = [
     "geometric_brownian_motion",
+    "geometric_brownian_motion_blocks",
+    "geometric_brownian_motion_sobol",
     "inhomogeneous_geometric_brownian_motion",
     "geometric_ornstein_uhlenbeck",
 ]
\ No newline at end of file
@@ -1,7 +1,13 @@
 from numbers import Number
+from typing import Iterator, Optional, Tuple
 import numpy as np
 from math import sqrt, log, ceil
 
+from ..utils.backends import use_numba
+from ..utils.distributions import normal_ppf
+from ..utils.quasi_random import brownian_bridge, sobol_sequence
+from ..utils.random_numbers import RandomState, default_rng, normal_shocks
+
 # TODO: t // time_step, n % 2 != 0:
 
 # n = 100
@@ -12,21 +18,102 @@ from math import sqrt, log, ceil
 # time_step = 1/12
 # testing = True
 
-def geometric_brownian_motion(
+# Default number of antithetic pairs simulated per block:
+DEFAULT_BLOCK_PAIRS = 2 ** 14
+
+
+def _shock_blocks(
+        number_loops: int,
+        number_steps: int,
+        sigma: Number,
+        time_step: Number,
+        block_loops: int,
+        testing: bool,
+        rng: RandomState,
+        dtype: np.dtype,
+) -> Iterator[Tuple[int, int, np.ndarray]]:
+    # (start, stop, shock) of each block of antithetic pairs, shock being (pairs x number_steps):
+    if rng is not None:
+        rng = default_rng(rng)
+        # Shock buffer, reused by every block:
+        shock_buffer = np.empty((min(block_loops, number_loops), number_steps), dtype=dtype)
+
+    for start in range(0, number_loops, block_loops):
+        stop = min(start + block_loops, number_loops)
+        loops = stop - start
+
+        # Shock:
+        if rng is None:
+            shock = (np.random.normal(loc=0, scale=sigma, size=loops *
+                                      number_steps).reshape((loops, number_steps)) * sqrt(time_step)).astype(dtype, copy=False)
+        else:
+            shock = normal_shocks(rng, (loops, number_steps), sigma * sqrt(time_step), out=shock_buffer[:loops])
+
+        if testing:
+            for i in range(loops):
+                shock[i, :] = np.arange(0, number_steps / 100,  0.01)
+
+        yield start, stop, shock
+
+
+def _simulate_block(
+        shock: np.ndarray,
+        ln_S0: float,
+        drift_t: np.ndarray,
+        thetic: np.ndarray,
+        antithetic: np.ndarray,
+        log_prices: bool,
+        numba: bool,
+) -> None:
+    # Thetic and antithetic (number_steps + 1 x pairs) paths, written in place in time-major layout:
+    if numba:
+        from ..utils.backends import geometric_brownian_motion_kernel
+        geometric_brownian_motion_kernel(shock, ln_S0, drift_t, thetic, antithetic, log_prices)
+        return
+
+    thetic[0] = antithetic[0] = ln_S0
+    ## Cumulative shock, accumulated down each (contiguous) time slice:
+    np.copyto(thetic[1:], shock.T)
+    np.cumsum(thetic[1:], axis=0, out=thetic[1:])
+    ## Antithetic values:
+    np.subtract(drift_t[:, np.newaxis], thetic[1:], out=antithetic[1:])
+    antithetic[1:] += ln_S0
+    ## Thetic values:
+    thetic[1:] += drift_t[:, np.newaxis]
+    thetic[1:] += ln_S0
+    if not log_prices:
+        np.exp(thetic, out=thetic)
+        np.exp(antithetic, out=antithetic)
+
+
+def geometric_brownian_motion_blocks(
         n: int,
         t: Number,
         mu: Number,
         sigma: Number,
         S0: Number,
         time_step: Number,
-        testing: bool = False
-) -> np.ndarray:
+        block_size: Optional[int] = None,
+        testing: bool = False,
+        backend: str = "numpy",
+        rng: RandomState = None,
+        dtype: np.dtype = np.float64,
+        log_prices: bool = False,
+) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Simulate geometric Brownian motion in blocks of paths, bounding peak memory by the block size rather than the number of simulations.
+
+    Yields `(columns, paths)` tuples, where `paths` is a (number_steps + 1 x block) array and `columns` are the indices of those paths
+    within the full `geometric_brownian_motion` output. The first half of each block are thetic paths, the second half their antithetic
+    pairs. Random draws are consumed in the same order as the full simulation, so the concatenated blocks reproduce it exactly.
+    Shocks are drawn from `rng` (a `numpy.random.Generator` or seed) into a buffer reused by every block, or from the legacy global
+    `np.random` state when `rng` is None. The "numba" `backend` fuses the cumulative shock and exponential into a single parallel pass over each block.
+    Paths are simulated in `dtype` (float64 or float32), as log prices with `log_prices`.
+    """
+    numba = use_numba(backend)
 
     # Dimension 1:
     number_steps = ceil(t / time_step)
-    # rounded_up = divmod(t, time_step)[1] > 1e-5
-    # if rounded_up:
-    #     number_steps += 1
 
     # Dimension 2:
     if n % 2 == 0:
@@ -35,33 +122,124 @@ def geometric_brownian_motion(
         number_simulations = n + 1
     number_loops = int(number_simulations / 2)
 
+    # Antithetic pairs per block:
+    block_loops = DEFAULT_BLOCK_PAIRS if block_size is None else max(block_size // 2, 1)
+
     ## natural log initial spot prices:
     ln_S0 = log(S0)
 
     # Drift:
     drift = (mu - (0.5 * sigma**2)) * time_step
     # Cumulative Drift per time point:
-    drift_t = np.cumsum(np.repeat(drift, number_steps))
-    # Shock:
-    shock = np.random.normal(loc = 0, scale=sigma, size=number_loops *
-                             number_steps).reshape((number_loops, number_steps)) * sqrt(time_step)
-    
-    if testing:
-        for i in range(number_loops):
-            shock[i,:] = np.arange(0, number_steps / 100,  0.01)  
+    drift_t = np.cumsum(np.repeat(drift, number_steps)).astype(dtype)
 
-    shock_cumulative = np.cumsum(shock, axis=1)
+    for start, stop, shock in _shock_blocks(
+            number_loops, number_steps, sigma, time_step, block_loops, testing, rng, dtype):
+        loops = stop - start
 
-    ## Initial values:
-    initial = np.repeat(ln_S0, number_simulations).reshape(number_simulations, 1)
+        ## Output block - rows by cols, thetic then antithetic paths:
+        paths = np.empty((number_steps + 1, 2 * loops), dtype=dtype)
+        _simulate_block(shock, ln_S0, drift_t, paths[:, :loops], paths[:, loops:], log_prices, numba)
 
-    ## Output array - cols by rows:
-    output = np.zeros((number_simulations, number_steps))
+        columns = np.r_[start:stop, (number_loops + start):(number_loops + stop)]
+        yield columns, paths
 
-    ## Thetic values:
-    output[:number_loops,:] = ln_S0 + np.add(drift_t, shock_cumulative)
-    ## Antithetic values:
-    output[(number_loops):(number_simulations+1),:] = ln_S0 + np.add(drift_t, -shock_cumulative)
+
+def geometric_brownian_motion(
+        n: int,
+        t: Number,
+        mu: Number,
+        sigma: Number,
+        S0: Number,
+        time_step: Number,
+        testing: bool = False,
+        out: Optional[np.ndarray] = None,
+        block_size: Optional[int] = None,
+        backend: str = "numpy",
+        rng: RandomState = None,
+        dtype: np.dtype = np.float64,
+        log_prices: bool = False,
+) -> np.ndarray:
+    """
+    Simulate geometric Brownian motion through Monte Carlo simulation and antithetic variates.
+
+    Returns a time-major, C-contiguous (number_steps + 1 x number_simulations) array - each time slice read by the backwards induction
+    is a contiguous block of memory. Paths are simulated in blocks of `block_size` paths directly into `out` when supplied (ie. an
+    `np.memmap`): the cumulative shock and exponential are evaluated in place, so peak memory beyond the output is bounded by the shocks
+    of a single block. Pass a `numpy.random.Generator` (or seed) as `rng` for reproducible simulations independent of the global
+    `np.random` state. `dtype` float32 halves the memory of the simulated paths. With `log_prices`, log prices are returned
+    (ie. as regressors of the LSM engines).
+    """
+    numba = use_numba(backend)
+
+    # Dimension 1:
+    number_steps = ceil(t / time_step)
+
+    # Dimension 2:
+    number_simulations = n if n % 2 == 0 else n + 1
+    number_loops = number_simulations // 2
+
+    ## Output array - rows by cols:
+    shape = (number_steps + 1, number_simulations)
+    if out is None:
+        out = np.empty(shape, dtype=dtype)
+    assert out.shape == shape, f"'out' must be of shape {shape}"
+
+    # Antithetic pairs per block:
+    block_loops = DEFAULT_BLOCK_PAIRS if block_size is None else max(block_size // 2, 1)
+
+    # Drift and cumulative drift per time point:
+    drift = (mu - (0.5 * sigma**2)) * time_step
+    drift_t = np.cumsum(np.repeat(drift, number_steps)).astype(out.dtype)
+
+    ## Thetic and antithetic paths occupy two contiguous column ranges, simulated in place:
+    for start, stop, shock in _shock_blocks(
+            number_loops, number_steps, sigma, time_step, block_loops, testing, rng, dtype):
+        _simulate_block(shock, log(S0), drift_t, out[:, start:stop],
+                        out[:, (number_loops + start):(number_loops + stop)], log_prices, numba)
 
     ## Final output:
-    return np.exp(np.concatenate([initial, output], axis=1)).transpose()
+    return out
+
+
+def geometric_brownian_motion_sobol(
+        n: int,
+        t: Number,
+        mu: Number,
+        sigma: Number,
+        S0: Number,
+        time_step: Number,
+        randomisations: Optional[int] = None,
+        rng: RandomState = None,
+        dtype: np.dtype = np.float64,
+) -> np.ndarray:
+    """
+    Simulate geometric Brownian motion through randomised quasi-Monte Carlo - scrambled Sobol points, mapped to normals through
+    the inverse normal distribution function and to Brownian motion through a Brownian bridge, so that the leading (best
+    distributed) Sobol dimensions determine the terminal value and coarse shape of each path.
+
+    Returns a (number_steps + 1 x n) array of paths. With `randomisations`, an array of (randomisations x number_steps + 1 x n)
+    independently scrambled path sets is returned - each is an unbiased simulation, and the spread of their option values
+    estimates the quasi-Monte Carlo error. Powers of two `n` are recommended.
+    """
+    rng = default_rng(rng)
+
+    # Dimension 1:
+    number_steps = ceil(t / time_step)
+
+    # Drift per time point:
+    drift_t = ((mu - 0.5 * sigma ** 2) * time_step * np.arange(number_steps + 1)).astype(dtype)
+
+    paths = np.empty((1 if randomisations is None else randomisations, number_steps + 1, n), dtype=dtype)
+    for randomisation in paths:
+        # Standard normals in Brownian bridge order, (number_steps x n):
+        normals = normal_ppf(sobol_sequence(n, number_steps, rng=rng).T)
+        # Log prices, ln(S0) + drift + sigma W(t):
+        randomisation[0] = 0
+        brownian_bridge(normals.astype(dtype, copy=False), time_step, out=randomisation[1:])
+        randomisation *= sigma
+        randomisation += drift_t[:, np.newaxis]
+        randomisation += log(S0)
+        np.exp(randomisation, out=randomisation)
+
+    return paths[0] if randomisations is None else paths
@@ -1,6 +1,58 @@
 from numbers import Number
 import numpy as np
-from math import sqrt, log, ceil
+from math import sqrt, log, ceil, exp
+
+from ..utils.backends import use_numba
+from ..utils.random_numbers import RandomState, normal_shocks
+
+# Fraction of the floating point mantissa that may be lost to the growth of the rescaling weights within a block of the
+# autoregressive kernel (ie. 2^10 for float64, 2^4 for float32):
+MAXIMUM_BLOCK_GROWTH_FRACTION = 1 / 5
+
+
+def autoregressive_paths(
+        out: np.ndarray,
+        phi: Number,
+        backend: str = "numpy"
+) -> np.ndarray:
+    """
+    Evaluate the AR(1) recursion out[k] = phi * out[k - 1] + out[k] in place, where `out[0]` holds the initial values and `out[1:]` the innovations.
+
+    The recursion is solved as an exponentially weighted cumulative sum over blocks of time, out[k0 + i] = phi^i (out[k0] + sum_j phi^-j e_j),
+    with blocks short enough that the weights phi^-j stay bounded. The "numba" `backend` evaluates the recursion directly, in parallel over paths.
+    """
+    if use_numba(backend):
+        from ..utils.backends import autoregressive_kernel
+        autoregressive_kernel(out, phi)
+        return out
+
+    number_steps = out.shape[0] - 1
+    if phi == 0 or number_steps == 0:
+        return out
+
+    # Block length:
+    maximum_block_growth = 2.0 ** int(np.finfo(out.dtype).nmant * MAXIMUM_BLOCK_GROWTH_FRACTION)
+    if abs(phi) < 1:
+        block_length = max(int(log(maximum_block_growth) / -log(abs(phi))), 1)
+    else:
+        block_length = number_steps
+    block_length = min(block_length, number_steps)
+
+    # Weights:
+    exponents = np.arange(1, block_length + 1)
+    powers = (phi ** exponents)[:, np.newaxis]
+    inverse_powers = (phi ** -exponents.astype(float))[:, np.newaxis]
+
+    for start in range(0, number_steps, block_length):
+        length = min(block_length, number_steps - start)
+        block = out[(start + 1):(start + 1 + length)]
+        block *= inverse_powers[:length]
+        np.cumsum(block, axis=0, out=block)
+        block += out[start]
+        block *= powers[:length]
+
+    return out
+
 
 def geometric_ornstein_uhlenbeck(
         n: int,
@@ -10,14 +62,24 @@ def geometric_ornstein_uhlenbeck(
         equilibrium: Number,
         risk_premium: Number,
         S0: Number,
-        time_step: Number
+        time_step: Number,
+        discretisation: str = "euler",
+        backend: str = "numpy",
+        rng: RandomState = None,
+        dtype: np.dtype = np.float64
 ) -> np.ndarray:
     """
     Simulate the geometric Ornstein-Uhlenbeck (GOU) stochastic process through Monte Carlo simulation and antithetic variates.
 
-    The geometric Ornstein-Uhlenbeck process is a member of the general affine class of stochastic process. The Ornstein-Uhlenbeck process is a 
-    Gaussian process, a Markov process, is temporally homogeneous and exhibits mean-reverting behaviour.    
+    The geometric Ornstein-Uhlenbeck process is a member of the general affine class of stochastic process. The Ornstein-Uhlenbeck process is a
+    Gaussian process, a Markov process, is temporally homogeneous and exhibits mean-reverting behaviour.
+
+    `discretisation` is either "euler" (Euler-Maruyama) or "exact" (the exact Gaussian transition of the log process). Both are linear
+    recursions in the log deviation from equilibrium and are evaluated without a Python loop over time steps. Thetic paths occupy the
+    first half of the simulations, their antithetic pairs the second half. Shocks are drawn from `rng` (a `numpy.random.Generator`
+    or seed), or from the legacy global `np.random` state when `rng` is None. Paths are simulated in `dtype` (float64 or float32).
     """
+    assert discretisation in ("euler", "exact"), "'discretisation' must be one of 'euler' or 'exact'"
 
     # Constant:
     risk_equilibrium = risk_premium / reversion_rate
@@ -37,32 +99,30 @@ def geometric_ornstein_uhlenbeck(
     # Even number of simulations conducted regardless:
     number_loops = int(number_simulations / 2)
 
-    # Thetic and antithetic columns:
-    simulated_value_columns = np.arange(0, number_simulations, 2)
-    antithetic_value_columns = simulated_value_columns + 1
+    # Autoregressive coefficient and shock volatility of the log deviation from the risk-adjusted equilibrium:
+    if discretisation == "euler":
+        phi = 1 - reversion_rate * time_step
+        shock_sigma = sigma * sqrt(time_step)
+    else:
+        phi = exp(-reversion_rate * time_step)
+        shock_sigma = sigma * sqrt((1 - phi ** 2) / (2 * reversion_rate))
 
     # shock:
-    shock = (np.random.normal(scale=sigma * sqrt(time_step), size=number_loops * number_simulated_steps)).reshape((number_simulated_steps, number_loops))
+    shock = normal_shocks(rng, (number_simulated_steps, number_loops), shock_sigma, dtype=dtype)
 
     # Output array:
-    output = np.zeros((number_steps_total, number_simulations))
-
-    # Initial values;
-    output[0] = log(S0) - log(equilibrium)
+    output = np.empty((number_steps_total, number_simulations), dtype=dtype)
 
-    # Begin Monte Carlo simulation:
-    t = 0
-    for t in range(1, number_steps_total):
+    # Initial values (deviation from the risk-adjusted equilibrium):
+    output[0] = log(S0) - log(equilibrium) - risk_equilibrium
 
-        drift = reversion_rate * (risk_equilibrium - output[t]) * time_step
+    # Simulated and antithetic innovations:
+    output[1:, :number_loops] = shock
+    np.negative(shock, out=output[1:, number_loops:])
 
-        # Simulated Values:
-        output[t, simulated_value_columns] = output[t - 1,
-                                                        simulated_value_columns] + drift[simulated_value_columns] + shock[t]
-
-        # Antithetic Values:
-        output[t, antithetic_value_columns] = output[t - 1,
-                                                         antithetic_value_columns] + drift[antithetic_value_columns] - shock[t]
+    # Begin Monte Carlo simulation:
+    autoregressive_paths(output, phi, backend=backend)
 
-    # Return output:
-    return np.exp(output[:, :n] + log(equilibrium))
+    # Return output - the trailing antithetic path of an odd `n` is dropped, keeping the paths contiguous:
+    output += log(equilibrium) + risk_equilibrium
+    return np.ascontiguousarray(np.exp(output, out=output)[:, :n])
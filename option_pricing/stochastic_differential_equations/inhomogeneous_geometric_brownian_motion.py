@@ -2,6 +2,9 @@ from numbers import Number
 import numpy as np
 from math import sqrt, log, ceil
 
+from ..utils.backends import use_numba
+from ..utils.random_numbers import RandomState, normal_shocks
+
 
 def inhomogeneous_geometric_brownian_motion(
         n: int,
@@ -10,8 +13,24 @@ def inhomogeneous_geometric_brownian_motion(
         equilibrium: Number,
         sigma: Number,
         S0: Number,
-        time_step: Number
+        time_step: Number,
+        discretisation: str = "euler",
+        backend: str = "numpy",
+        rng: RandomState = None,
+        dtype: np.dtype = np.float64
 ) -> np.ndarray:
+    """
+    Simulate the inhomogeneous geometric Brownian motion (IGBM) stochastic process through Monte Carlo simulation and antithetic variates.
+
+    `discretisation` is either "euler" (log-Euler, stepped through time with in-place updates) or "exact". The "exact" scheme uses the
+    pathwise solution S_t = F_t (S0 + reversion_rate * equilibrium * int_0^t F_s^-1 ds), F_t = exp(-(reversion_rate + sigma^2 / 2) t + sigma W_t),
+    with the Brownian motion sampled exactly and the integral evaluated by the trapezoidal rule - no Python loop over time steps, and
+    simulated values remain positive. Thetic paths occupy the first half of the simulations, their antithetic pairs the second half.
+    The "numba" `backend` fuses each log-Euler step into a single parallel pass over paths. Shocks are drawn from `rng` (a
+    `numpy.random.Generator` or seed), or from the legacy global `np.random` state when `rng` is None. Paths are simulated in `dtype`
+    (float64 or float32).
+    """
+    assert discretisation in ("euler", "exact"), "'discretisation' must be one of 'euler' or 'exact'"
 
     # Constant:
     adjusted_risk = 0.5 * (sigma ** 2)
@@ -32,36 +51,69 @@ def inhomogeneous_geometric_brownian_motion(
     # Even number of simulations conducted regardless:
     number_loops = int(number_simulations / 2)
 
-    # Thetic and antithetic columns:
-    simulated_value_columns = np.arange(0, number_simulations, 2)
-    antithetic_value_columns = simulated_value_columns + 1
-
     # shock:
-    shock = (np.random.normal(scale=sigma * sqrt(time_step), size=number_loops * number_simulated_steps)).reshape((number_simulated_steps, number_loops))
+    shock = normal_shocks(rng, (number_simulated_steps, number_loops), sigma * sqrt(time_step), dtype=dtype)
 
     # Output array:
-    output = np.zeros((number_steps_total, number_simulations))
+    output = np.empty((number_steps_total, number_simulations), dtype=dtype)
+
+    if discretisation == "exact":
+
+        # Brownian motion (sigma W_t), thetic and antithetic:
+        output[0] = 0
+        output[1:, :number_loops] = shock
+        np.negative(shock, out=output[1:, number_loops:])
+        np.cumsum(output, axis=0, out=output)
+
+        # Log of the exponential Brownian motion F_t:
+        output -= ((reversion_rate + adjusted_risk) * time_step *
+                   np.arange(number_steps_total))[:, np.newaxis].astype(dtype)
+
+        # Trapezoidal integral of F_s^-1, with F_0 = 1:
+        #   int_0^t_k F_s^-1 ds ~ time_step * (cumsum(F^-1)_k - 1/2 - F_k^-1 / 2)
+        integral = np.exp(-output)
+        np.cumsum(integral, axis=0, out=integral)
+        integral -= 0.5
+        integral *= reversion_rate * equilibrium * time_step
+        integral += S0
+
+        # S_t = F_t * (S0 + reversion_rate * equilibrium * integral):
+        np.exp(output, out=output)
+        output *= integral
+        output -= 0.5 * reversion_rate * equilibrium * time_step
+
+        # Return output - the trailing antithetic path of an odd `n` is dropped, keeping the paths contiguous:
+        return np.ascontiguousarray(output[:, :n])
 
     # Initial values;
     output[0] = log(S0)
 
+    if use_numba(backend):
+        from ..utils.backends import inhomogeneous_geometric_brownian_motion_kernel
+        inhomogeneous_geometric_brownian_motion_kernel(
+            output, shock, reversion_rate * equilibrium * time_step, (reversion_rate + adjusted_risk) * time_step)
+        return np.ascontiguousarray(np.exp(output, out=output)[:, :n])
+
+    # Preallocated buffers:
+    level = np.empty(number_simulations, dtype=dtype)
+    drift = np.empty(number_simulations, dtype=dtype)
+
     # Begin Monte Carlo simulation:
     for t in range(number_simulated_steps):
 
         # Log-distribution:
-        output_exp_t = np.exp(output[t])
+        np.exp(output[t], out=level)
 
-        # Mean-reverting drift:
-        drift = (reversion_rate * ((equilibrium - output_exp_t) /
-                 output_exp_t) - adjusted_risk) * time_step
+        # Mean-reverting drift, (reversion_rate * (equilibrium - S) / S - adjusted_risk) * time_step:
+        np.divide(reversion_rate * equilibrium * time_step, level, out=drift)
+        drift -= (reversion_rate + adjusted_risk) * time_step
+        np.add(output[t], drift, out=output[t + 1])
 
         # Simulated Values:
-        output[t + 1, simulated_value_columns] = output[t,
-                                                        simulated_value_columns] + drift[simulated_value_columns] + shock[t]
+        output[t + 1, :number_loops] += shock[t]
 
         # Antithetic Values:
-        output[t + 1, antithetic_value_columns] = output[t,
-                                                         antithetic_value_columns] + drift[antithetic_value_columns] - shock[t]
+        output[t + 1, number_loops:] -= shock[t]
 
-    # Return output:
-    return np.exp(output[:, :n])
+    # Return output - the trailing antithetic path of an odd `n` is dropped, keeping the paths contiguous:
+    return np.ascontiguousarray(np.exp(output, out=output)[:, :n])
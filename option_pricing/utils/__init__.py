@@ -1,10 +1,44 @@
 
-from .continuation_value import estimate_continuation_value
+from .continuation_value import (
+    OrthogonalBasis,
+    Orthogonals,
+    RegressionBasis,
+    estimate_continuation_value,
+    estimate_in_the_money_continuation_value,
+    least_squares,
+    register_orthogonal,
+    stacked_least_squares,
+)
 from .discount import discount
-from .option_results import AmericanOption
+from .lattice import binomial_lattice
+from .option_results import AmericanOption, RealOption
+from .parallel import parallel_monte_carlo_simulation
+from .path_store import load_paths, save_paths, simulate_paths
+from .random_numbers import default_rng
+from .simulation_cache import SimulationCache
+from .trace import LSMTrace, PeriodTrace
+from .workspace import LSMWorkspace
 
 __all__ = [
     "estimate_continuation_value",
+    "estimate_in_the_money_continuation_value",
+    "least_squares",
+    "OrthogonalBasis",
+    "Orthogonals",
+    "RegressionBasis",
+    "register_orthogonal",
+    "stacked_least_squares",
     "discount",
-    "AmericanOption"
+    "binomial_lattice",
+    "AmericanOption",
+    "RealOption",
+    "parallel_monte_carlo_simulation",
+    "load_paths",
+    "save_paths",
+    "simulate_paths",
+    "default_rng",
+    "SimulationCache",
+    "LSMTrace",
+    "PeriodTrace",
+    "LSMWorkspace",
 ]
\ No newline at end of file
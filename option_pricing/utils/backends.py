@@ -0,0 +1,225 @@
+from typing import Callable, Tuple
+
+import numpy as np
+
+# Optional Numba JIT compilation of the hot loops - falls back to NumPy when Numba is not installed:
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+NUMBA_AVAILABLE = njit is not None
+
+# __name__ = 'option_pricing.utils.backends'
+
+BACKENDS = ("numpy", "numba")
+
+
+def use_numba(backend: str) -> bool:
+    """
+    Whether the fused Numba kernels are used for `backend`. Requesting "numba" without Numba installed transparently uses NumPy.
+    """
+    assert backend in BACKENDS, f"'backend' must be one of {BACKENDS}"
+    return backend == "numba" and NUMBA_AVAILABLE
+
+
+##############################################################################
+######################### LSM BACKWARDS INDUCTION: ###########################
+##############################################################################
+
+def _lsm_continuation_numpy(profit_t, value, discount_rate, continuation_value, in_the_money_paths):
+    np.greater(profit_t, 0, out=in_the_money_paths)
+    np.multiply(value, discount_rate, out=continuation_value)
+    return np.count_nonzero(in_the_money_paths)
+
+
+def _lsm_exercise_numpy(profit_t, continuation_value, value, exercise_timings, exercise, discount_rate, t):
+    np.greater(profit_t, continuation_value, out=exercise)
+    # Discount existing values if not exercising
+    value *= discount_rate
+    # Receive immediate profit if exercising
+    np.copyto(value, profit_t, where=exercise)
+    # Was the option exercised?
+    np.copyto(exercise_timings, t, where=exercise)
+
+
+if NUMBA_AVAILABLE:
+
+    @njit(parallel=True, cache=True)
+    def _lsm_continuation_numba(profit_t, value, discount_rate, continuation_value, in_the_money_paths):
+        number_in_the_money = 0
+        for i in prange(profit_t.shape[0]):
+            continuation_value[i] = value[i] * discount_rate
+            in_the_money = profit_t[i] > 0
+            in_the_money_paths[i] = in_the_money
+            if in_the_money:
+                number_in_the_money += 1
+        return number_in_the_money
+
+    @njit(parallel=True, cache=True)
+    def _lsm_exercise_numba(profit_t, continuation_value, value, exercise_timings, exercise, discount_rate, t):
+        for i in prange(profit_t.shape[0]):
+            exercised = profit_t[i] > continuation_value[i]
+            exercise[i] = exercised
+            if exercised:
+                value[i] = profit_t[i]
+                exercise_timings[i] = t
+            else:
+                value[i] *= discount_rate
+
+
+# Compacted kernels - in-the-money paths are addressed through an index array, all other paths are only touched by the discount:
+def _lsm_in_the_money_numpy(profit_t, value, discount_rate, in_the_money_index, continuation_value_in_the_money,
+                            in_the_money_paths, path_index):
+    value *= discount_rate
+    np.greater(profit_t, 0, out=in_the_money_paths)
+    number_in_the_money = np.count_nonzero(in_the_money_paths)
+    in_the_money_index = np.compress(in_the_money_paths, path_index, out=in_the_money_index[:number_in_the_money])
+    # Indices are valid - "clip" avoids the buffered copy of the default "raise" mode:
+    np.take(value, in_the_money_index, out=continuation_value_in_the_money[:number_in_the_money], mode="clip")
+    return number_in_the_money
+
+
+def _lsm_exercise_in_the_money_numpy(profit_t, fitted_values, value, exercise_timings, in_the_money_index, t,
+                                     profit_in_the_money, exercise, exercised_index):
+    number_in_the_money = in_the_money_index.shape[0]
+    profit_in_the_money = np.take(profit_t, in_the_money_index, out=profit_in_the_money[:number_in_the_money], mode="clip")
+    exercise = np.greater(profit_in_the_money, fitted_values, out=exercise[:number_in_the_money])
+    number_exercised = np.count_nonzero(exercise)
+    exercised_index = np.compress(exercise, in_the_money_index, out=exercised_index[:number_exercised])
+    # Receive immediate profit if exercising - the fitted values are no longer required, their buffer holds the exercised profits:
+    np.put(value, exercised_index, np.compress(exercise, profit_in_the_money, out=fitted_values[:number_exercised]))
+    # Was the option exercised?
+    np.put(exercise_timings, exercised_index, t)
+
+
+if NUMBA_AVAILABLE:
+
+    @njit(cache=True)
+    def _lsm_in_the_money_numba(profit_t, value, discount_rate, in_the_money_index, continuation_value_in_the_money,
+                                in_the_money_paths, path_index):
+        # Sequential - a single pass discounts every path and compacts the in-the-money paths in order:
+        number_in_the_money = 0
+        for i in range(profit_t.shape[0]):
+            value[i] *= discount_rate
+            if profit_t[i] > 0:
+                in_the_money_index[number_in_the_money] = i
+                continuation_value_in_the_money[number_in_the_money] = value[i]
+                number_in_the_money += 1
+        return number_in_the_money
+
+    @njit(parallel=True, cache=True)
+    def _lsm_exercise_in_the_money_numba(profit_t, fitted_values, value, exercise_timings, in_the_money_index, t,
+                                         profit_in_the_money, exercise, exercised_index):
+        for j in prange(in_the_money_index.shape[0]):
+            i = in_the_money_index[j]
+            if profit_t[i] > fitted_values[j]:
+                value[i] = profit_t[i]
+                exercise_timings[i] = t
+
+
+def lsm_kernels(backend: str = "numpy") -> Tuple[Callable, Callable]:
+    """
+    The per-period kernels of the LSM backwards induction:
+
+    continuation(profit_t, value, discount_rate, continuation_value, in_the_money_paths) -> number of in-the-money paths,
+        writes the discounted value of waiting and the in-the-money mask.
+    exercise(profit_t, continuation_value, value, exercise_timings, exercise, discount_rate, t),
+        writes the exercise decision and updates the option value and exercise timings in place.
+    """
+    if use_numba(backend):
+        return _lsm_continuation_numba, _lsm_exercise_numba
+    return _lsm_continuation_numpy, _lsm_exercise_numpy
+
+
+def lsm_in_the_money_kernels(backend: str = "numpy") -> Tuple[Callable, Callable]:
+    """
+    The per-period kernels of the LSM backwards induction upon compacted in-the-money paths:
+
+    in_the_money(profit_t, value, discount_rate, in_the_money_index, continuation_value_in_the_money, in_the_money_paths,
+                 path_index) -> number of in-the-money paths,
+        discounts the value of every path in place, and writes the index and (discounted) value of the in-the-money paths.
+    exercise(profit_t, fitted_values, value, exercise_timings, in_the_money_index, t, profit_in_the_money, exercise,
+             exercised_index),
+        exercises the in-the-money paths whose profit exceeds their fitted continuation value.
+
+    `in_the_money_paths`, `path_index` (0, ..., N - 1), `profit_in_the_money`, `exercise` and `exercised_index` are the scratch
+    buffers of the NumPy kernels (ie. of an `LSMWorkspace`).
+    """
+    if use_numba(backend):
+        return _lsm_in_the_money_numba, _lsm_exercise_in_the_money_numba
+    return _lsm_in_the_money_numpy, _lsm_exercise_in_the_money_numpy
+
+
+##############################################################################
+###################### STOCHASTIC DIFFERENTIAL EQUATIONS: ####################
+##############################################################################
+
+if NUMBA_AVAILABLE:
+
+    @njit(parallel=True, cache=True)
+    def geometric_brownian_motion_kernel(shock, ln_S0, drift_t, thetic, antithetic, log_prices):
+        # thetic, antithetic: (steps + 1 x loops) time-major outputs.
+        # Paths are processed in chunks, so that each time step writes a contiguous run of every output row:
+        number_loops, number_steps = shock.shape
+        initial = ln_S0 if log_prices else np.exp(ln_S0)
+        chunk = 64
+        for c in prange((number_loops + chunk - 1) // chunk):
+            start = c * chunk
+            stop = min(start + chunk, number_loops)
+            shock_cumulative = np.zeros(stop - start)
+            for i in range(start, stop):
+                thetic[0, i] = initial
+                antithetic[0, i] = initial
+            for k in range(number_steps):
+                for i in range(start, stop):
+                    shock_cumulative[i - start] += shock[i, k]
+                    thetic_value = ln_S0 + (drift_t[k] + shock_cumulative[i - start])
+                    antithetic_value = ln_S0 + (drift_t[k] - shock_cumulative[i - start])
+                    if log_prices:
+                        thetic[k + 1, i] = thetic_value
+                        antithetic[k + 1, i] = antithetic_value
+                    else:
+                        thetic[k + 1, i] = np.exp(thetic_value)
+                        antithetic[k + 1, i] = np.exp(antithetic_value)
+
+    @njit(parallel=True, cache=True)
+    def autoregressive_kernel(out, phi):
+        # out[k] = phi * out[k - 1] + out[k]:
+        for k in range(1, out.shape[0]):
+            for j in prange(out.shape[1]):
+                out[k, j] += phi * out[k - 1, j]
+
+    @njit(parallel=True, cache=True)
+    def inhomogeneous_geometric_brownian_motion_kernel(output, shock, reversion_equilibrium_step, drift_step):
+        # Log-Euler in place, thetic then antithetic columns:
+        number_loops = shock.shape[1]
+        for t in range(shock.shape[0]):
+            for j in prange(output.shape[1]):
+                drift = reversion_equilibrium_step / np.exp(output[t, j]) - drift_step
+                if j < number_loops:
+                    output[t + 1, j] = output[t, j] + drift + shock[t, j]
+                else:
+                    output[t + 1, j] = output[t, j] + drift - shock[t, j - number_loops]
+
+
+##############################################################################
+############################ RESULT DIAGNOSTICS: #############################
+##############################################################################
+
+if NUMBA_AVAILABLE:
+
+    @njit(parallel=True, cache=True)
+    def payback_kernel(net_cash_flow, exercised_paths, benefits_accrued, capital_expenditure):
+        # First period at which cumulative accrued net cash flows exceed each path's capital expenditure (-1 if never):
+        payback_achieved = np.full(exercised_paths.shape[0], -1, dtype=np.int64)
+        for j in prange(exercised_paths.shape[0]):
+            path = exercised_paths[j]
+            accrued = 0.0
+            for i in range(net_cash_flow.shape[0]):
+                if i >= benefits_accrued[j]:
+                    accrued += net_cash_flow[i, path]
+                if accrued > capital_expenditure[j]:
+                    payback_achieved[j] = i
+                    break
+        return payback_achieved
@@ -1,35 +1,448 @@
 from enum import Enum
+from typing import Callable, Dict, NamedTuple, Optional, Tuple, Union
 
 import numpy as np
-from numpy.polynomial import chebyshev, hermite, laguerre, legendre, polynomial
+
+from .trace import NULL_TRACE, LSMTrace
+from .workspace import LSMWorkspace
 
 # __name__ = 'option_pricing._utils.continuation_value'
 
-# Available Numpy implementations of orthogonal polynomials:
+##############################################################################
+############################ ORTHOGONAL BASES: ###############################
+##############################################################################
+
+# Each basis is evaluated through its three-term recurrence:
+#     P_0(x) = 1,    P_{k+1}(x) = (alpha_k x + beta_k) P_k(x) - gamma_k P_{k-1}(x)
+# after the state variables have been shifted and scaled onto the natural domain of the basis.
+
+
+class OrthogonalBasis(NamedTuple):
+    # k -> (alpha_k, beta_k, gamma_k), alpha_k must be non-zero:
+    recurrence: Callable[[int], Tuple[float, float, float]]
+    # state variables (N x V) -> (shift, scale), each of length V:
+    standardisation: Callable[[np.ndarray], Tuple[np.ndarray, np.ndarray]]
+
+
+# Standardisations - column reductions only, no temporaries the size of the cross-section of paths:
+def _unit_scale(x: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    return np.zeros(x.shape[1]), np.maximum(x.max(axis=0), -x.min(axis=0))
+
+
+def _positive_scale(x: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    return np.zeros(x.shape[1]), np.abs(x.mean(axis=0, dtype=np.float64))
+
+
+def _interval_scale(x: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    minimum, maximum = x.min(axis=0), x.max(axis=0)
+    return (maximum + minimum) / 2, (maximum - minimum) / 2
+
 
+def _standard_scale(x: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    mean = x.mean(axis=0, dtype=np.float64)
+    # Squared deviations, accumulated chunk by chunk:
+    variance = np.zeros(x.shape[1])
+    for start in range(0, x.shape[0], ACCUMULATION_CHUNK):
+        deviation = x[start:(start + ACCUMULATION_CHUNK)] - mean
+        variance += np.square(deviation, out=deviation).sum(axis=0)
+    return mean, np.sqrt(variance / x.shape[0])
 
+
+# Available orthogonal polynomials (matching numpy.polynomial's polyval, lagval, legval, chebval and hermval):
 class Orthogonals(Enum):
-    POWER: polynomial.polyval
-    LAGUERRE: laguerre.lagval
-    LEGENDRE: legendre.legval
-    CHEBYSHEV: chebyshev.chebval
-    HERMITE: hermite.hermval
+    POWER = OrthogonalBasis(
+        recurrence=lambda k: (1.0, 0.0, 0.0),
+        standardisation=_unit_scale)
+    LAGUERRE = OrthogonalBasis(
+        recurrence=lambda k: (-1 / (k + 1), (2 * k + 1) / (k + 1), k / (k + 1)),
+        standardisation=_positive_scale)
+    LEGENDRE = OrthogonalBasis(
+        recurrence=lambda k: ((2 * k + 1) / (k + 1), 0.0, k / (k + 1)),
+        standardisation=_interval_scale)
+    CHEBYSHEV = OrthogonalBasis(
+        recurrence=lambda k: (1.0 if k == 0 else 2.0, 0.0, 0.0 if k == 0 else 1.0),
+        standardisation=_interval_scale)
+    HERMITE = OrthogonalBasis(
+        recurrence=lambda k: (2.0, 0.0, 2.0 * k),
+        standardisation=_standard_scale)
+
+
+# Registry of bases available by name - includes user registered bases:
+orthogonal_bases: Dict[str, OrthogonalBasis] = {
+    member.name: member.value for member in Orthogonals}
+
+
+def register_orthogonal(name: str, basis: OrthogonalBasis) -> None:
+    """
+    Register a basis under `name`, making it available to the LSM engines through `orthogonal=name`.
+    """
+    assert isinstance(
+        basis, OrthogonalBasis), "'basis' must be an 'OrthogonalBasis'"
+    orthogonal_bases[name.upper()] = basis
+
+
+def get_orthogonal(orthogonal: Union[str, Orthogonals, OrthogonalBasis]) -> OrthogonalBasis:
+    if isinstance(orthogonal, OrthogonalBasis):
+        return orthogonal
+    if isinstance(orthogonal, Orthogonals):
+        return orthogonal.value
+    assert orthogonal.upper() in orthogonal_bases, f"'orthogonal' must be one of {list(orthogonal_bases)}"
+    return orthogonal_bases[orthogonal.upper()]
+
+
+class RegressionBasis():
+    """
+    Evaluates the LSM regression matrix - an intercept, the first `degree` polynomials of each state variable
+    and (optionally) the pairwise cross products of the state variables.
+
+    All columns are evaluated in a single pass of the three-term recurrence, written directly into a
+    (column-major) regression matrix. The shift / scale applied to the state variables is computed from the
+    cross-section of paths it is first given (the in-the-money paths, in the LSM engines) and cached per time
+    period, so repeated evaluations on the same simulation reuse them.
+    """
+
+    def __init__(
+            self,
+            orthogonal: Union[str, Orthogonals, OrthogonalBasis] = "Power",
+            degree: int = 2,
+            cross_product: bool = True,
+    ):
+        self.basis = get_orthogonal(orthogonal)
+        # The state variables themselves (first degree polynomials) are always included:
+        self.degree = max(degree, 1)
+        self.cross_product = cross_product
+
+        # Recurrence coefficients, in the form used by the in-place evaluation:
+        self._coefficients = []
+        for k in range(self.degree):
+            alpha, beta, gamma = self.basis.recurrence(k)
+            assert alpha != 0, "Recurrence coefficient 'alpha' must be non-zero"
+            self._coefficients.append((alpha, beta / alpha, gamma))
+
+        # Cached (shift, scale) per time period:
+        self._parameters = {}
+        # Scratch columns:
+        self._scratch = np.empty((0, 2))
+
+    def number_regressors(self, number_state_variables: int) -> int:
+        number_cross_products = number_state_variables * \
+            (number_state_variables - 1) // 2 if self.cross_product else 0
+        return 1 + number_state_variables * self.degree + number_cross_products
+
+    def parameters(
+            self,
+            state_variables_t: np.ndarray,
+            period: Optional[int] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+
+        if period is not None and period in self._parameters:
+            return self._parameters[period]
+
+        if state_variables_t.ndim == 1:
+            state_variables_t = state_variables_t[:, np.newaxis]
+        shift, scale = self.basis.standardisation(state_variables_t)
+        # Degenerate cross-sections (ie. the initial period) are left unscaled:
+        scale = np.where(scale > 0, scale, 1.0)
+        parameters = (np.asarray(shift, dtype=float), 1 / scale)
+
+        if period is not None:
+            self._parameters[period] = parameters
+        return parameters
+
+    def _standardise(self, x: np.ndarray, shift: float, inverse_scale: float, out: np.ndarray) -> np.ndarray:
+        np.subtract(x, shift, out=out)
+        return np.multiply(out, inverse_scale, out=out)
+
+    def evaluate(
+            self,
+            state_variables_t: np.ndarray,
+            parameters: Optional[Tuple[np.ndarray, np.ndarray]] = None,
+            out: Optional[np.ndarray] = None,
+            scratch: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+
+        # Must be ndarray:
+        if state_variables_t.ndim == 1:
+            state_variables_t = state_variables_t[:, np.newaxis]
+        number_paths, number_state_variables = state_variables_t.shape
+
+        if parameters is None:
+            parameters = self.parameters(state_variables_t)
+        shift, inverse_scale = parameters
+
+        # The regression matrix inherits the precision of the state variables:
+        shape = (number_paths, self.number_regressors(number_state_variables))
+        if out is None:
+            out = np.empty(shape, order="F", dtype=np.result_type(state_variables_t.dtype, np.float32))
+        assert out.shape == shape, f"'out' must be of shape {shape}"
+
+        # Scratch columns - (paths x 2) of the precision of `out`, ie. of an `LSMWorkspace`:
+        if scratch is None:
+            if self._scratch.shape[0] < number_paths or self._scratch.dtype != out.dtype:
+                self._scratch = np.empty((number_paths, 2), order="F", dtype=out.dtype)
+            scratch = self._scratch
+        standardised, scaled = scratch[:number_paths, 0], scratch[:number_paths, 1]
+
+        # Intercept (P_0):
+        out[:, 0] = 1
+        column = 1
+
+        # Orthogonal polynomials of each state variable:
+        for i in range(number_state_variables):
+            self._standardise(
+                state_variables_t[:, i], shift[i], inverse_scale[i], out=standardised)
+            previous, current = None, out[:, 0]
+            for alpha, beta_alpha, gamma in self._coefficients:
+                following = out[:, column]
+                # (alpha x + beta) P_k = alpha (x + beta / alpha) P_k:
+                np.add(standardised, beta_alpha, out=following)
+                following *= current
+                following *= alpha
+                if gamma != 0:
+                    following -= np.multiply(previous, gamma, out=scaled)
+                previous, current = current, following
+                column += 1
+
+        # Cross products:
+        if self.cross_product:
+            for i in range(number_state_variables):
+                for j in range(i+1, number_state_variables):
+                    self._standardise(
+                        state_variables_t[:, i], shift[i], inverse_scale[i], out=standardised)
+                    self._standardise(
+                        state_variables_t[:, j], shift[j], inverse_scale[j], out=scaled)
+                    np.multiply(standardised, scaled, out=out[:, column])
+                    column += 1
+
+        return out
+
+##############################################################################
+########################## LEAST-SQUARES SOLVERS: ############################
+##############################################################################
+
+# Normal equations are only trusted below this condition number of the (column-scaled) Gram matrix,
+# the QR factorisation below this condition number of R. Beyond these the next solver is used:
+MAXIMUM_GRAM_CONDITION = 1e10
+MAXIMUM_QR_CONDITION = 1e13
+
+# Rows reduced / factorised in float64 at a time (ie. of reduced precision regression matrices):
+ACCUMULATION_CHUNK = 2 ** 14
+
+
+def _svd_least_squares(X: np.ndarray, y: np.ndarray) -> np.ndarray:
+    return np.linalg.lstsq(X.astype(np.float64, copy=False), y.astype(np.float64, copy=False), rcond=None)[0]
+
+
+def _qr_least_squares(X: np.ndarray, y: np.ndarray) -> np.ndarray:
+
+    # Fewer paths than regressors (ie. deep out of the money) - the minimum norm solution of SVD:
+    number_paths, number_regressors = X.shape
+    if number_paths < number_regressors:
+        return _svd_least_squares(X, y)
+
+    # Householder R of the augmented matrix [X | y], updated chunk by chunk in float64 - Q is never formed, and Q'y is the
+    # trailing columns of R:
+    right_hand_sides = y.reshape(number_paths, -1)
+    width = number_regressors + right_hand_sides.shape[1]
+    stacked = np.empty((width + ACCUMULATION_CHUNK, width))
+    height = 0
+    for start in range(0, number_paths, ACCUMULATION_CHUNK):
+        stop = min(start + ACCUMULATION_CHUNK, number_paths)
+        rows = height + stop - start
+        stacked[height:rows, :number_regressors] = X[start:stop]
+        stacked[height:rows, number_regressors:] = right_hand_sides[start:stop]
+        R = np.linalg.qr(stacked[:rows], mode="r")
+        height = R.shape[0]
+        stacked[:height] = R
+    R, moment = stacked[:number_regressors, :number_regressors], stacked[:number_regressors, number_regressors:]
+
+    # Rank deficient / ill-conditioned - fall back to SVD:
+    diagonal = np.abs(np.diag(R))
+    if diagonal.min() * MAXIMUM_QR_CONDITION <= diagonal.max():
+        return _svd_least_squares(X, y)
+
+    return np.linalg.solve(R, moment).reshape((number_regressors,) + y.shape[1:])
+
+
+def _normal_equations(X: np.ndarray, y: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+
+    # X'X and X'y, accumulated in float64 - reduced precision inputs are promoted chunk by chunk:
+    if X.dtype == np.float64 and y.dtype == np.float64:
+        return X.T @ X, X.T @ y
+    number_regressors = X.shape[1]
+    gram, moment = np.zeros((number_regressors, number_regressors)), np.zeros((number_regressors,) + y.shape[1:])
+    for start in range(0, X.shape[0], ACCUMULATION_CHUNK):
+        X_chunk = X[start:(start + ACCUMULATION_CHUNK)].astype(np.float64)
+        gram += X_chunk.T @ X_chunk
+        moment += X_chunk.T @ y[start:(start + ACCUMULATION_CHUNK)].astype(np.float64)
+    return gram, moment
+
+
+def _cholesky_least_squares(X: np.ndarray, y: np.ndarray) -> np.ndarray:
+
+    # Accumulated X'X and X'y - an O(N K^2) pass followed by a K x K solve:
+    gram, moment = _normal_equations(X, y)
+
+    # Jacobi (column) scaling of the normal equations:
+    scale = np.sqrt(np.diag(gram))
+    if not scale.all():
+        return _qr_least_squares(X, y)
+    gram = gram / np.outer(scale, scale)
+    # Columns of several right-hand sides share the scaling:
+    scale = scale.reshape((-1,) + (1,) * (moment.ndim - 1))
+    moment = moment / scale
+
+    # Conditioning check - fall back to QR when the normal equations would lose too much precision:
+    if np.linalg.cond(gram) > MAXIMUM_GRAM_CONDITION:
+        return _qr_least_squares(X, y)
+    try:
+        lower = np.linalg.cholesky(gram)
+    except np.linalg.LinAlgError:
+        return _qr_least_squares(X, y)
+
+    return np.linalg.solve(lower.T, np.linalg.solve(lower, moment)) / scale
+
+
+# Available least-squares solvers - fallback order is CHOLESKY -> QR -> SVD:
+least_squares_solvers = {
+    "SVD": _svd_least_squares,
+    "QR": _qr_least_squares,
+    "CHOLESKY": _cholesky_least_squares,
+}
+
+
+def least_squares(
+        X: np.ndarray,
+        y: np.ndarray,
+        solver: str = "svd",
+) -> np.ndarray:
+    """
+    Least-squares coefficients of `y` regressed upon `X`.
+
+    `solver` is one of "svd" (`np.linalg.lstsq`), "qr" (Householder R of [X | y], without forming Q) or "cholesky" (normal
+    equations). The QR and Cholesky solvers check the conditioning of their factorisations and automatically fall back to a more
+    stable solver. Reduced precision (float32) inputs are solved in float64 - the QR and Cholesky solvers accumulate their
+    factorisations in float64, `ACCUMULATION_CHUNK` rows at a time, without copying the full regression matrix. A 2-d `y` solves several right-hand sides against a single factorisation of `X`.
+    """
+    assert solver.upper() in least_squares_solvers, f"'solver' must be one of {list(least_squares_solvers)}"
+    return least_squares_solvers[solver.upper()](X, y)
+
+
+def stacked_least_squares(
+        X: np.ndarray,
+        weights: np.ndarray,
+        y: np.ndarray,
+) -> np.ndarray:
+    """
+    Fitted values of one weighted least-squares regression per row of `weights` and `y` (systems x paths) upon a shared
+    (paths x K) regression matrix `X` - ie. the in-the-money regressions of several contracts or projects on the same paths.
+
+    The per-path outer products of the (column scaled) regression matrix are shared by every system: X'WX and X'Wy of all systems
+    are accumulated in float64 through two matrix products per block of `ACCUMULATION_CHUNK` paths, and solved as one stack. The
+    pseudo-inverse copes with systems of fewer in-the-money paths than regressors. Returns the fitted values (systems x paths).
+    """
+    number_paths, number_regressors = X.shape
+    number_systems = weights.shape[0]
+
+    # Column scaling keeps the normal equations well conditioned (fitted values are unaffected):
+    scale = np.abs(X).max(axis=0).astype(np.float64)
+    scale[scale == 0] = 1
+
+    gram = np.zeros((number_systems, number_regressors ** 2))
+    moment = np.zeros((number_systems, number_regressors))
+    for start in range(0, number_paths, ACCUMULATION_CHUNK):
+        stop = start + ACCUMULATION_CHUNK
+        X_chunk = X[start:stop] / scale
+        # Per-path outer products, flattened: X_i X_i' (paths x K^2):
+        outer_products = (X_chunk[:, :, np.newaxis] * X_chunk[:, np.newaxis, :]).reshape(-1, number_regressors ** 2)
+        weights_chunk = weights[:, start:stop]
+        gram += weights_chunk @ outer_products
+        moment += (weights_chunk * y[:, start:stop]) @ X_chunk
+
+    coefficients = np.linalg.pinv(gram.reshape(-1, number_regressors, number_regressors), hermitian=True) @ moment[:, :, np.newaxis]
+    return (coefficients[:, :, 0] / scale) @ X.T
 
 ##############################################################################
 ####################### ESTIMATED CONTINUATION VALUE: ########################
 ##############################################################################
 
 
+def regression_matrix(
+        state_variables_t: np.ndarray,
+        orthogonal: Union[str, Orthogonals, OrthogonalBasis],
+        degree: int,
+        cross_product: bool,
+        out: Optional[np.ndarray] = None,
+) -> np.ndarray:
+
+    # Independendent variables:
+    return RegressionBasis(
+        orthogonal=orthogonal,
+        degree=degree,
+        cross_product=cross_product).evaluate(state_variables_t, out=out)
+
+
 def estimate_continuation_value(
         continuation_value: np.array,
         state_variables_t: np.ndarray,
-        orthogonal: Orthogonals,
+        orthogonal: Union[str, Orthogonals, OrthogonalBasis],
         degree: int,
         cross_product: bool,
-        in_the_money_paths: np.ndarray | None = None,
+        in_the_money_paths: Optional[np.ndarray] = None,
+        solver: str = "svd",
+        basis: Optional[RegressionBasis] = None,
+        period: Optional[int] = None,
+        workspace: Optional[LSMWorkspace] = None,
+        trace: LSMTrace = NULL_TRACE,
 ):
 
-    orthogonal_function = orthogonal_functions[orthogonal.upper()]
+    # Basis evaluation - pass a 'basis' and 'period' to reuse cached scaling across calls:
+    if basis is None:
+        basis = RegressionBasis(
+            orthogonal=orthogonal,
+            degree=degree,
+            cross_product=cross_product)
+    parameters = basis.parameters(state_variables_t, period)
+
+    # Must be ndarray:
+    if state_variables_t.ndim == 1:
+        state_variables_t = state_variables_t[:, np.newaxis]
+    number_state_variables = state_variables_t.shape[1]
+
+    # Gather in-the-money paths into preallocated buffers, evaluate and scatter fitted values back in place:
+    if in_the_money_paths is not None and workspace is not None:
+        number_in_the_money = np.count_nonzero(in_the_money_paths)
+        number_regressors = basis.number_regressors(number_state_variables)
+        workspace.reserve(len(continuation_value),
+                          number_state_variables, number_regressors, dtype=continuation_value.dtype)
+
+        # Value of waiting:
+        continuation_value_in_the_money = np.compress(
+            in_the_money_paths, continuation_value,
+            out=workspace.continuation_value_in_the_money[:number_in_the_money])
+        # Underlying state variables that drive the asset:
+        state_variables_t_in_the_money = np.compress(
+            in_the_money_paths, state_variables_t, axis=0,
+            out=workspace.state_variables_in_the_money(number_in_the_money, number_state_variables))
+        trace.mark("gather")
+
+        # Independendent variables:
+        X = basis.evaluate(state_variables_t_in_the_money, parameters=parameters,
+                           out=workspace.regression_matrix(number_in_the_money, number_regressors),
+                           scratch=workspace.scratch(number_in_the_money))
+        trace.mark("basis")
+        trace.regression(X)
+
+        # Perform Least-Squares regression and obtain fitted values:
+        coefficients = least_squares(
+            X, continuation_value_in_the_money, solver=solver)
+        trace.mark("least_squares")
+        # Coefficients are cast to the working precision - a mixed precision product would copy X:
+        np.place(continuation_value, in_the_money_paths, np.matmul(
+            X, coefficients.astype(X.dtype, copy=False), out=workspace.fitted_values[:number_in_the_money]))
+        trace.mark("scatter")
+
+        return continuation_value
 
     # Only in-the-money paths are considered in the LSM regression:
     # Value of waiting:
@@ -41,37 +454,80 @@ def estimate_continuation_value(
     else:
         continuation_value_in_the_money = continuation_value.copy()
         # Underlying state variables that drive the asset:
-        state_variables_t_in_the_money = state_variables_t.copy()
-
-    # Must be ndarray:
-    if state_variables_t_in_the_money.ndim == 1:
-        state_variables_t_in_the_money = state_variables_t_in_the_money[:, np.newaxis]
+        state_variables_t_in_the_money = state_variables_t
+    trace.mark("gather")
 
     # Independendent variables:
-    regression_matrix = np.c_[
-        # Obtain an intercept and the first n orthogonal polynomials:
-        np.concatenate(orthogonal.value(
-            state_variables_t_in_the_money, np.eye(degree+1)), axis=1),
-        # The state variables themselves are included within the regression:
-        state_variables_t_in_the_money
-    ]
-
-    # Append cross products:
-    number_state_variables = state_variables_t_in_the_money.shape[1]
-    if cross_product and number_state_variables > 1:
-        regression_matrix = np.concatenate([regression_matrix] +
-                                           np.column_stack([state_variables_t_in_the_money[:, i] * state_variables_t_in_the_money[:, j]
-                                                            for i in range(number_state_variables)
-                                                            for j in range(i+1, number_state_variables)
-                                                            ]), axis=1
-                                           )
+    X = basis.evaluate(state_variables_t_in_the_money, parameters=parameters)
+    trace.mark("basis")
+    trace.regression(X)
 
     # Perform Least-Squares regression and obtain fitted values:
+    coefficients = least_squares(
+        X, continuation_value_in_the_money, solver=solver)
+    trace.mark("least_squares")
     if in_the_money_paths is not None:
-        continuation_value[in_the_money_paths] = regression_matrix @ np.linalg.lstsq(
-            regression_matrix, continuation_value_in_the_money, rcond=None)[0]
+        continuation_value[in_the_money_paths] = X @ coefficients
     else:
-        continuation_value = regression_matrix @ np.linalg.lstsq(
-            regression_matrix, continuation_value_in_the_money, rcond=None)[0]
+        continuation_value = X @ coefficients
+    trace.mark("scatter")
 
     return continuation_value
+
+
+def estimate_in_the_money_continuation_value(
+        continuation_value_in_the_money: np.ndarray,
+        state_variables_t: np.ndarray,
+        in_the_money_index: np.ndarray,
+        basis: RegressionBasis,
+        workspace: LSMWorkspace,
+        solver: str = "svd",
+        period: Optional[int] = None,
+        trace: LSMTrace = NULL_TRACE,
+) -> np.ndarray:
+    """
+    Fitted continuation values of the in-the-money paths `in_the_money_index` (ie. of `np.flatnonzero`), given their values of
+    waiting `continuation_value_in_the_money` - the compacted form of `estimate_continuation_value`.
+
+    The state variables of the in-the-money paths are gathered once into the workspace (cast to its precision), and the fitted
+    values are returned within the workspace (in the order of `in_the_money_index`) - paths out of the money are not touched. The
+    NA check and the shift / scale of the basis are those of the gathered in-the-money paths.
+    """
+    # Must be ndarray:
+    if state_variables_t.ndim == 1:
+        state_variables_t = state_variables_t[:, np.newaxis]
+    number_state_variables = state_variables_t.shape[1]
+    number_in_the_money = in_the_money_index.shape[0]
+    number_regressors = basis.number_regressors(number_state_variables)
+
+    # Underlying state variables that drive the asset:
+    state_variables_t_in_the_money = workspace.state_variables_in_the_money(number_in_the_money, number_state_variables)
+    if state_variables_t.dtype == state_variables_t_in_the_money.dtype:
+        np.take(state_variables_t, in_the_money_index, axis=0, mode="clip", out=state_variables_t_in_the_money)
+    else:
+        # Cast to the working precision chunk by chunk, rather than through a full copy:
+        for start in range(0, number_in_the_money, ACCUMULATION_CHUNK):
+            stop = start + ACCUMULATION_CHUNK
+            state_variables_t_in_the_money[start:stop] = state_variables_t[in_the_money_index[start:stop]]
+    # NA's propagate through the minimum - a reduction, without a mask of every path:
+    assert not np.isnan(state_variables_t_in_the_money.min()), "NA's cannot be specified within 'state_variables'"
+    parameters = basis.parameters(state_variables_t_in_the_money, period)
+    trace.mark("gather")
+
+    # Independendent variables:
+    X = basis.evaluate(state_variables_t_in_the_money, parameters=parameters,
+                       out=workspace.regression_matrix(number_in_the_money, number_regressors),
+                       scratch=workspace.scratch(number_in_the_money))
+    trace.mark("basis")
+    trace.regression(X)
+
+    # Perform Least-Squares regression and obtain fitted values:
+    coefficients = least_squares(
+        X, continuation_value_in_the_money, solver=solver)
+    trace.mark("least_squares")
+    # Coefficients are cast to the working precision - a mixed precision product would copy X:
+    fitted_values = np.matmul(X, coefficients.astype(X.dtype, copy=False),
+                              out=workspace.fitted_values[:number_in_the_money])
+    trace.mark("scatter")
+
+    return fitted_values
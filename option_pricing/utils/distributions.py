@@ -0,0 +1,138 @@
+from math import pi, sqrt
+from typing import Optional
+
+import numpy as np
+
+# Optional SciPy special functions - falls back to a NumPy rational approximation when SciPy is not installed:
+try:
+    from scipy.special import ndtr, ndtri
+except ImportError:
+    ndtr = ndtri = None
+
+# __name__ = 'option_pricing.utils.distributions'
+
+# Hart (1968) double precision approximation of the standard normal tail, as given by West (2005):
+_NUMERATOR = (3.52624965998911e-02, 0.700383064443688, 6.37396220353165, 33.912866078383,
+              112.079291497871, 221.213596169931, 220.206867912376)
+_DENOMINATOR = (8.83883476483184e-02, 1.75566716318264, 16.064177579207, 86.7807322029461,
+                296.564248779674, 637.333633378831, 793.826512519948, 440.413735824752)
+_CONTINUED_FRACTION_BOUNDARY = 7.07106781186547
+_SQRT_2_PI = sqrt(2 * pi)
+
+
+def normal_pdf(x: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Standard normal probability density function - evaluated in place within `out` (which may be `x`) when supplied.
+    """
+    x = np.asarray(x, dtype=float)
+    if out is None:
+        out = np.empty(x.shape)
+    np.multiply(x, x, out=out)
+    out *= -0.5
+    np.exp(out, out=out)
+    out /= _SQRT_2_PI
+    return out
+
+
+def normal_cdf(x: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Standard normal cumulative distribution function (`scipy.special.ndtr` when available, otherwise absolute error below 1e-15) -
+    written into `out` (which may be `x`) when supplied.
+    """
+    if ndtr is not None:
+        return ndtr(x, out=out) if out is not None else ndtr(x)
+
+    x = np.asarray(x, dtype=float)
+    absolute = np.abs(np.atleast_1d(x))
+    density = np.square(absolute)
+    density *= -0.5
+    np.exp(density, out=density)
+
+    # Rational approximation of the tail, |x| < 7.07 (Horner's scheme, in place - within `out`, once `x` has been read):
+    upper = x > 0
+    numerator = np.multiply(absolute, _NUMERATOR[0], out=out if out is not None and out.ndim > 0 else None)
+    for coefficient in _NUMERATOR[1:-1]:
+        numerator += coefficient
+        numerator *= absolute
+    numerator += _NUMERATOR[-1]
+    denominator = absolute * _DENOMINATOR[0]
+    for coefficient in _DENOMINATOR[1:-1]:
+        denominator += coefficient
+        denominator *= absolute
+    denominator += _DENOMINATOR[-1]
+    tail = numerator
+    with np.errstate(invalid="ignore"):
+        tail *= density
+        tail /= denominator
+
+    # Continued fraction beyond:
+    far = absolute >= _CONTINUED_FRACTION_BOUNDARY
+    if far.any():
+        fraction = absolute[far] + 0.65
+        for k in (4, 3, 2, 1):
+            fraction = absolute[far] + k / fraction
+        tail[far] = density[far] / fraction / _SQRT_2_PI
+
+    # Upper tail:
+    tail = tail.reshape(x.shape)
+    np.subtract(1, tail, out=tail, where=upper)
+    if out is not None and out.ndim == 0:
+        np.copyto(out, tail)
+        return out
+    return tail
+
+
+# Acklam's rational approximation of the standard normal quantile function:
+_CENTRAL_NUMERATOR = (-3.969683028665376e+01, 2.209460984245205e+02, -2.759285104469687e+02,
+                      1.383577518672690e+02, -3.066479806614716e+01, 2.506628277459239e+00)
+_CENTRAL_DENOMINATOR = (-5.447609879822406e+01, 1.615858368580409e+02, -1.556989798598866e+02,
+                        6.680131188771972e+01, -1.328068155288572e+01, 1.0)
+_TAIL_NUMERATOR = (-7.784894002430293e-03, -3.223964580411365e-01, -2.400758277161838e+00,
+                   -2.549732539343734e+00, 4.374664141464968e+00, 2.938163982698783e+00)
+_TAIL_DENOMINATOR = (7.784695709041462e-03, 3.224671290700398e-01, 2.445134137142996e+00,
+                     3.754408661907416e+00, 1.0)
+_TAIL_BOUNDARY = 0.02425
+
+
+def _horner(coefficients, x: np.ndarray) -> np.ndarray:
+    result = np.full_like(x, coefficients[0])
+    for coefficient in coefficients[1:]:
+        result *= x
+        result += coefficient
+    return result
+
+
+def normal_ppf(p: np.ndarray) -> np.ndarray:
+    """
+    Standard normal quantile function - the inverse of `normal_cdf` (`scipy.special.ndtri` when available, otherwise Acklam's
+    approximation refined by a single Halley step).
+    """
+    if ndtri is not None:
+        return ndtri(p)
+
+    p = np.asarray(p, dtype=float)
+    shape = p.shape
+    p = np.atleast_1d(p).ravel()
+    x = np.empty_like(p)
+
+    # Central region:
+    central = (p >= _TAIL_BOUNDARY) & (p <= 1 - _TAIL_BOUNDARY)
+    q = p[central] - 0.5
+    r = q * q
+    x[central] = q * _horner(_CENTRAL_NUMERATOR, r) / _horner(_CENTRAL_DENOMINATOR, r)
+
+    # Tails, by symmetry:
+    tail = ~central
+    with np.errstate(divide="ignore", invalid="ignore"):
+        q = np.sqrt(-2 * np.log(np.minimum(p[tail], 1 - p[tail])))
+        x[tail] = np.where(p[tail] < 0.5, 1, -1) * _horner(_TAIL_NUMERATOR, q) / _horner(_TAIL_DENOMINATOR, q)
+
+        # Halley refinement:
+        error = normal_cdf(x) - p
+        u = error * _SQRT_2_PI * np.exp(0.5 * x * x)
+        refined = x - u / (1 + 0.5 * x * u)
+    x = np.where(np.isfinite(refined), refined, x)
+    x[p == 0] = -np.inf
+    x[p == 1] = np.inf
+
+    return x.reshape(shape)
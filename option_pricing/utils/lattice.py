@@ -0,0 +1,210 @@
+from math import ceil
+from numbers import Number
+from typing import Tuple, Union
+
+import numpy as np
+
+from .distributions import normal_cdf
+
+# __name__ = 'option_pricing.utils.lattice'
+
+ArrayLike = Union[Number, np.ndarray]
+
+# Lattice schemes:
+#   "crr":  Cox-Ross-Rubinstein.
+#   "lr":   Leisen-Reimer (Peizer-Pratt inversion), an odd number of steps.
+#   "bbs":  binomial Black-Scholes - CRR with Black-Scholes values at the penultimate step.
+#   "bbsr": binomial Black-Scholes with two-point Richardson extrapolation, 2 BBS(n) - BBS(n / 2), an even number of steps.
+LATTICE_METHODS = ("crr", "lr", "bbs", "bbsr")
+
+
+def cox_ross_rubinstein(
+        risk_free_rate: np.ndarray,
+        time_step: Number,
+        sigma: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Up / down factors and risk-neutral probability of an up move of the Cox-Ross-Rubinstein (CRR) binomial tree.
+    """
+    up = np.exp(sigma * np.sqrt(time_step))
+    down = 1 / up
+    premium_rate = np.exp(risk_free_rate * time_step)
+    # Degenerate (zero volatility) trees move up with certainty:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        probability = np.where(up != down, (premium_rate - down) / (up - down), 1.0)
+    return up, down, probability
+
+
+def _peizer_pratt(z: np.ndarray, number_steps: int) -> np.ndarray:
+    # Peizer-Pratt (method 2) inversion of the normal distribution to a binomial probability:
+    return 0.5 + np.copysign(0.5, z) * np.sqrt(
+        1 - np.exp(-(z / (number_steps + 1 / 3 + 0.1 / (number_steps + 1))) ** 2 * (number_steps + 1 / 6)))
+
+
+def leisen_reimer(
+        risk_free_rate: np.ndarray,
+        time_step: Number,
+        sigma: np.ndarray,
+        stock_price: np.ndarray,
+        strike_price: np.ndarray,
+        number_steps: int,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Up / down factors and risk-neutral probability of an up move of the Leisen-Reimer binomial tree, centred upon the strike.
+    `number_steps` should be odd.
+    """
+    maturity = number_steps * time_step
+    volatility = sigma * np.sqrt(maturity)
+    d1 = (np.log(stock_price / strike_price) + (risk_free_rate + 0.5 * sigma ** 2) * maturity) / volatility
+    d2 = d1 - volatility
+    probability = _peizer_pratt(d2, number_steps)
+    premium_rate = np.exp(risk_free_rate * time_step)
+    up = premium_rate * _peizer_pratt(d1, number_steps) / probability
+    down = (premium_rate - probability * up) / (1 - probability)
+    return up, down, probability
+
+
+def _black_scholes_merton(
+        stock_price: np.ndarray,
+        strike_price: np.ndarray,
+        risk_free_rate: np.ndarray,
+        sigma: np.ndarray,
+        maturity: Number,
+        sign: np.ndarray,
+) -> np.ndarray:
+    # European value, sign * (S N(sign d1) - K exp(-r T) N(sign d2)), with sign = 1 (call) or -1 (put):
+    volatility = sigma * np.sqrt(maturity)
+    d1 = (np.log(stock_price / strike_price) + (risk_free_rate + 0.5 * sigma ** 2) * maturity) / volatility
+    d2 = d1 - volatility
+    return sign * (stock_price * normal_cdf(sign * d1) -
+                   strike_price * np.exp(-risk_free_rate * maturity) * normal_cdf(sign * d2))
+
+
+def _backward_induction(
+        risk_free_rate: np.ndarray,
+        maturity: Number,
+        sigma: np.ndarray,
+        stock_price: np.ndarray,
+        strike_price: np.ndarray,
+        sign: np.ndarray,
+        number_steps: int,
+        early_exercise: bool,
+        method: str,
+) -> np.ndarray:
+
+    time_step = maturity / number_steps
+
+    # Risk neutral probabilities:
+    if method == "lr":
+        up, down, probability = leisen_reimer(
+            risk_free_rate, time_step, sigma, stock_price, strike_price, number_steps)
+    else:
+        up, down, probability = cox_ross_rubinstein(risk_free_rate, time_step, sigma)
+    assert ((probability >= 0) & (probability <= 1)).all(), "Risk-neutral probabilities outside of [0, 1] - reduce 'time_step'"
+
+    # Discounted transition weights:
+    discount_rate = np.exp(-risk_free_rate * time_step)
+    up_weight = discount_rate * probability
+    down_weight = discount_rate * (1 - probability)
+    inverse_down = 1 / down
+
+    # Black-Scholes smoothing replaces the final step of the tree:
+    smoothing = method in ("bbs", "bbsr") and number_steps > 1
+    terminal_step = number_steps - 1 if smoothing else number_steps
+
+    # Terminal node prices, S u^j d^(n-j):
+    nodes = np.arange(terminal_step + 1)
+    prices = stock_price * np.exp(nodes * np.log(up) + (terminal_step - nodes) * np.log(down))
+
+    # Payoff at maturity / European value over the final step:
+    if smoothing:
+        value = _black_scholes_merton(prices, strike_price, risk_free_rate, sigma, time_step, sign)
+    else:
+        value = np.subtract(prices, strike_price)
+        value *= sign
+        np.maximum(value, 0, out=value)
+
+    # Preallocated buffer:
+    scratch = np.empty_like(value)
+
+    if smoothing and early_exercise:
+        np.subtract(prices, strike_price, out=scratch)
+        scratch *= sign
+        np.maximum(value, scratch, out=value)
+
+    # Backward induction:
+    for i in range(terminal_step, 0, -1):
+
+        continuation = value[:, :i]
+        buffer = scratch[:, :i]
+
+        # Discounted risk-neutral expectation of the (down, up) successor nodes:
+        np.multiply(value[:, 1:(i + 1)], up_weight, out=buffer)
+        continuation *= down_weight
+        continuation += buffer
+
+        if early_exercise:
+            # Node prices of step i - 1:
+            node_prices = prices[:, :i]
+            node_prices *= inverse_down
+            # Immediate exercise:
+            np.subtract(node_prices, strike_price, out=buffer)
+            buffer *= sign
+            np.maximum(continuation, buffer, out=continuation)
+
+    return value[:, 0]
+
+
+def binomial_lattice(
+        risk_free_rate: ArrayLike,
+        time_step: Number,
+        sigma: ArrayLike,
+        stock_price: ArrayLike,
+        strike_price: ArrayLike,
+        n: Number,
+        call_option: ArrayLike = True,
+        early_exercise: bool = True,
+        method: str = "crr",
+) -> Union[float, np.ndarray]:
+    """
+    Value of European or American (`early_exercise`) options through backward induction over a recombining binomial tree.
+
+    Only a single value vector per option is held - the tree is never stored. Node prices are rolled back from the terminal
+    nodes, S u^j d^(i-j) = S u^j d^(i+1-j) / d, so memory is O(number of steps). Array valued `risk_free_rate`, `sigma`,
+    `stock_price`, `strike_price` and `call_option` are broadcast together and a whole option chain is valued in a single
+    vectorised pass over the lattice. The maturity `n` (years) is split into ceil(n / time_step) steps of length `time_step`.
+
+    `method` is one of "crr" (Cox-Ross-Rubinstein), "lr" (Leisen-Reimer - an even number of steps is increased by one),
+    "bbs" (Black-Scholes values at the penultimate step) or "bbsr" (BBS with Richardson extrapolation - an odd number of
+    steps is increased by one). The latter three converge smoothly and reach CRR accuracy with far fewer steps.
+    """
+    assert method in LATTICE_METHODS, f"'method' must be one of {LATTICE_METHODS}"
+
+    # Option chain:
+    risk_free_rate, sigma, stock_price, strike_price, call_option = np.broadcast_arrays(
+        *(np.asarray(x, dtype=float) for x in (risk_free_rate, sigma, stock_price, strike_price)), np.asarray(call_option, dtype=bool))
+    shape = stock_price.shape
+    risk_free_rate, sigma, stock_price, strike_price, call_option = (
+        x.reshape((-1, 1)) for x in (risk_free_rate, sigma, stock_price, strike_price, call_option))
+
+    # Number of discrete time steps:
+    number_steps = max(ceil(n / time_step), 1)
+    maturity = number_steps * time_step
+    if method == "lr" and number_steps % 2 == 0:
+        number_steps += 1
+    if method == "bbsr" and number_steps % 2 == 1:
+        number_steps += 1
+
+    # Exercise value is sign * (S - K):
+    sign = np.where(call_option, 1.0, -1.0)
+
+    option_value = _backward_induction(
+        risk_free_rate, maturity, sigma, stock_price, strike_price, sign, number_steps, early_exercise, method)
+
+    # Richardson extrapolation of the error, proportional to 1 / number_steps:
+    if method == "bbsr":
+        option_value = 2 * option_value - _backward_induction(
+            risk_free_rate, maturity, sigma, stock_price, strike_price, sign, number_steps // 2, early_exercise, method)
+
+    option_value = option_value.reshape(shape)
+    return float(option_value) if option_value.ndim == 0 else option_value
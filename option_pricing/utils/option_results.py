@@ -1,79 +1,318 @@
 from math import sqrt
-from statistics import mean, variance
-import pandas as pd
+
 import numpy as np
 
-## TODO: np.var vs statistics.variance (div n vs. n - 1)
+from .backends import use_numba
+
+
+# Exercised paths per block of the payback search:
+PAYBACK_CHUNK_SIZE = 2 ** 16
+
+
+def _pandas():
+    # Optional pandas, imported upon first use - only required by `to_pandas`:
+    try:
+        import pandas
+    except ImportError:
+        return None
+    return pandas
+
+
+def _pooled_moments(counts, means, variances):
+    """
+    Mean and sample variance (n - 1) of the union of independent samples, from each sample's count, mean and sample variance.
+    """
+    counts, means, variances = (np.asarray(x, dtype=float) for x in (counts, means, variances))
+    populated = counts > 0
+    counts, means, variances = counts[populated], means[populated], variances[populated]
+    total = counts.sum()
+    if total == 0:
+        return np.nan, np.nan
+    pooled_mean = (counts * means).sum() / total
+    if total < 2:
+        return pooled_mean, np.nan
+    # Within sample (a sample of a single path contributes no variance) and between sample sums of squares:
+    sum_squares = (np.maximum(counts - 1, 0) * np.nan_to_num(variances)).sum() + (counts * (means - pooled_mean) ** 2).sum()
+    return pooled_mean, sum_squares / (total - 1)
+
+
+def _standard_error(values, number_simulations):
+    # Sample (n - 1) standard error of the mean:
+    return sqrt(np.var(values, ddof=1) / number_simulations) if len(values) > 1 else np.nan
+
+
+def payback_periods(
+        net_cash_flow,
+        exercise_timings,
+        capital_expenditure,
+        construction_periods=0,
+        chunk_size=PAYBACK_CHUNK_SIZE,
+        backend="numpy",
+        ):
+    """
+    Payback period of each exercised path - the first period at which the net cash flows accrued from completing construction
+    (`construction_periods` after exercise) exceed the capital expenditure, or -1 if the capital expenditure is never recovered.
+
+    `capital_expenditure` is a constant or time varying (one per period), the latter charged at each path's exercise period.
+    Paths are processed in blocks of `chunk_size` (None - all at once): a single masked cumulative sum and threshold search per block.
+    """
+    number_periods = net_cash_flow.shape[0]
+    exercised_paths = np.flatnonzero(~np.isnan(exercise_timings))
+    exercise_period = exercise_timings[exercised_paths].astype(np.intp)
+    # Time point at which net cash flows are accrued:
+    benefits_accrued = exercise_period + construction_periods
+
+    # Capital expenditure of each exercised path:
+    capital_expenditure = np.asarray(capital_expenditure, dtype=float)
+    if capital_expenditure.ndim == 0:
+        threshold = np.full(len(exercised_paths), float(capital_expenditure))
+    else:
+        assert capital_expenditure.size == number_periods, "time varying 'capital_expenditure' must have one value per period"
+        threshold = capital_expenditure.reshape(-1)[exercise_period]
+
+    if use_numba(backend):
+        ## Fused, parallel accrual and payback search over exercised paths:
+        from .backends import payback_kernel
+        return payback_kernel(net_cash_flow, exercised_paths, benefits_accrued, threshold)
+
+    payback_achieved = np.empty(len(exercised_paths), dtype=np.intp)
+    periods = np.arange(number_periods)[:, np.newaxis]
+    chunk_size = max(len(exercised_paths) if chunk_size is None else chunk_size, 1)
+    for start in range(0, len(exercised_paths), chunk_size):
+        stop = min(start + chunk_size, len(exercised_paths))
+        # Net cash flows accrued from the completion of construction:
+        invested_NCF = net_cash_flow[:, exercised_paths[start:stop]]
+        invested_NCF[periods < benefits_accrued[start:stop]] = 0
+        np.cumsum(invested_NCF, axis=0, out=invested_NCF)
+        ## When (if ever) do accrued benefits of investment exceed capital investment?
+        exceeded = invested_NCF > threshold[start:stop]
+        first = np.argmax(exceeded, axis=0)
+        # argmax is also 0 where the capital expenditure is never recovered:
+        never = ~exceeded[first, np.arange(stop - start)]
+        first[never] = -1
+        payback_achieved[start:stop] = first
+    return payback_achieved
+
+
+class _LSMResult():
+    """
+    Exercise statistics shared by LSM results.
+
+    Exercise probability and expected exercise time are evaluated upon construction. The exercise histogram (exercised paths per
+    period) and cumulative exercise probability are evaluated lazily, upon first access. Results are pickled (ie. returned by
+    parallel workers) with their lazy statistics evaluated and without the underlying path arrays. `trace` is the `LSMTrace` of
+    an instrumented pricing run, otherwise None.
+
+    Statistics are NumPy arrays whether or not pandas is installed - `to_pandas` is the (optional) pandas view.
+    """
+
+    __slots__ = (
+        "number_simulations", "number_periods", "time_step", "expected_exercise_years", "exercise_probability",
+        "_exercise_timings", "_exercise_histogram", "_exercise_probability_cumulative", "trace",
+    )
+
+    # Per path arrays, only held until the lazy statistics are evaluated:
+    _PATH_ARRAYS = ("_exercise_timings",)
+
+    def _exercise_statistics(self, exercise_timings, number_simulations, number_periods, time_step):
+        self.number_simulations = number_simulations
+        self.number_periods = number_periods
+        self.time_step = time_step
+        self._exercise_timings = exercise_timings
+        self._exercise_histogram = self._exercise_probability_cumulative = None
+        self.trace = None
+
+        # Exercise probability and expected exercise time (conditional on exercise):
+        exercise_period = exercise_timings[~np.isnan(exercise_timings)]
+        self.exercise_probability = len(exercise_period) / number_simulations
+        self.expected_exercise_years = float(np.mean(exercise_period)) * time_step if len(exercise_period) > 0 else None
+
+    @property
+    def exercise_histogram(self) -> np.ndarray:
+        """
+        Number of simulations exercised at each period.
+        """
+        if self._exercise_histogram is None:
+            exercise_timings = self._exercise_timings
+            exercise_period = exercise_timings[~np.isnan(exercise_timings)].astype(np.intp)
+            self._exercise_histogram = np.bincount(exercise_period, minlength=self.number_periods)
+        return self._exercise_histogram
+
+    @property
+    def exercise_times(self) -> np.ndarray:
+        """
+        Exercise time (years) of each period.
+        """
+        return np.arange(self.number_periods) * self.time_step
+
+    @property
+    def exercise_probability_cumulative(self) -> np.ndarray:
+        """
+        Probability of exercise by each period - of exercise time `exercise_times`.
+        """
+        if self._exercise_probability_cumulative is None:
+            self._exercise_probability_cumulative = np.cumsum(self.exercise_histogram) / self.number_simulations
+        return self._exercise_probability_cumulative
+
+    def to_pandas(self):
+        """
+        Cumulative exercise probability as a `pandas.Series` indexed by exercise time (years) - requires pandas.
+        """
+        pd = _pandas()
+        assert pd is not None, "'to_pandas' requires pandas to be installed"
+        return pd.Series(self.exercise_probability_cumulative, index=self.exercise_times, name="counts")
+
+    def _evaluate(self):
+        # Evaluate every lazy statistic:
+        self.exercise_probability_cumulative
+
+    def __getstate__(self):
+        self._evaluate()
+        state = {}
+        for cls in type(self).__mro__:
+            for name in getattr(cls, "__slots__", ()):
+                state[name] = None if name in self._PATH_ARRAYS else getattr(self, name)
+        return state
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            setattr(self, name, value)
+
+    def _merge_exercise_statistics(self, options, counts):
+        # Exercise statistics of results valued on independent simulations:
+        number_simulations = int(counts.sum())
+        self.number_simulations = number_simulations
+        self.number_periods = options[0].number_periods
+        self.time_step = options[0].time_step
+        self._exercise_timings = self._exercise_probability_cumulative = self.trace = None
+
+        # Exercise histograms are summed:
+        self._exercise_histogram = sum(option.exercise_histogram for option in options)
+
+        # Exercise probability and expected exercise time (weighted by exercised simulations):
+        exercised = np.array([option.exercise_probability for option in options]) * counts
+        self.exercise_probability = exercised.sum() / number_simulations
+        self.expected_exercise_years = sum(
+            count * option.expected_exercise_years for count, option in zip(exercised, options) if count > 0
+        ) / exercised.sum() if exercised.sum() > 0 else None
+        return exercised
+
+
+class AmericanOption(_LSMResult):
+    """
+    Least-Squares Monte Carlo value of an American option - price and standard error, exercise statistics and, given a control
+    variate, the control variate adjusted price and standard error.
+    """
+
+    __slots__ = (
+        "call_option", "option_price", "standard_error",
+        "control_variate_coefficient", "control_variate_option_price", "control_variate_standard_error",
+    )
 
-class AmericanOption():
-    
     def __init__(
-            self, 
+            self,
             american_option_value,
-            number_simulations, 
-            exercise_timings, 
+            number_simulations,
+            exercise_timings,
             number_periods,
             time_step,
-            call_option
+            call_option,
+            control_variate=None,
+            control_variate_mean=None,
             ):
 
         self.call_option = call_option
 
-        # American option value - discounting payoffs back to time zero, averaging over all paths.
-        exercised = ~np.isnan(exercise_timings)
-        exercise_period = exercise_timings[exercised].astype(int)
+        # Option value and standard error - discounting payoffs back to time zero, averaging over all paths:
+        self.option_price = np.mean(american_option_value)
+        self.standard_error = _standard_error(american_option_value, number_simulations)
 
-        # american_option_value[exercised] = profit[exercise_period,exercised] * np.exp(- nominal_interest_rate * exercise_period)
+        # Exercise timings:
+        self._exercise_statistics(exercise_timings, number_simulations, number_periods, time_step)
 
-        # Option value:
-        self.option_price = np.mean(american_option_value)
+        # Control variate adjusted option value and standard error:
+        self.control_variate_coefficient = self.control_variate_option_price = self.control_variate_standard_error = None
+        if control_variate is not None:
+            self._control_variate(american_option_value, control_variate, control_variate_mean)
 
-        # Execise time:
-        exercise_time = exercise_period * time_step
+    def __repr__(self):
+        option = "call" if self.call_option else "put"
+        return f"American {option} option: {self.option_price:.2f} ({self.standard_error:.4f})"
 
-        # Option value standard error:
-        self.standard_error = sqrt(variance(american_option_value) / number_simulations)
+    def _control_variate(self, american_option_value, control_variate, control_variate_mean):
+        """
+        Adjust path values by a control variate of known mean, X - beta (Y - E[Y]), with the variance minimising coefficient
+        beta = Cov(X, Y) / Var(Y) estimated from the same paths.
+        """
+        control_variate = np.asarray(control_variate, dtype=float)
+        covariance = np.cov(american_option_value, control_variate)
+        self.control_variate_coefficient = covariance[0, 1] / covariance[1, 1] if covariance[1, 1] > 0 else 0.0
+        adjusted_value = american_option_value - self.control_variate_coefficient * (control_variate - control_variate_mean)
+        self.control_variate_option_price = np.mean(adjusted_value)
+        self.control_variate_standard_error = sqrt(np.var(adjusted_value, ddof=1) / self.number_simulations)
 
-        # Expected exercise time
-        self.expected_exercise_years = mean(exercise_time)
+    @classmethod
+    def merge(cls, options):
+        """
+        Combine `AmericanOption` results priced on independent simulations (ie. parallel workers) into a single result.
 
-        # Exercise probability:
-        self.exercise_probability = len(exercise_period) / number_simulations
+        Prices and standard errors are pooled from each result's mean and variance; exercise statistics are weighted by the
+        number of simulations (or exercised simulations) of each result.
+        """
+        options = list(options)
+        counts = np.array([option.number_simulations for option in options], dtype=float)
+
+        merged = cls.__new__(cls)
+        merged.call_option = options[0].call_option
+        merged._merge_exercise_statistics(options, counts)
+        number_simulations = merged.number_simulations
+
+        # Option value and standard error:
+        merged.option_price, pooled_variance = _pooled_moments(
+            counts,
+            [option.option_price for option in options],
+            [option.standard_error ** 2 * option.number_simulations for option in options])
+        merged.standard_error = sqrt(pooled_variance / number_simulations)
+
+        # Control variate adjusted option value and standard error (coefficients are estimated per result):
+        merged.control_variate_coefficient = merged.control_variate_option_price = merged.control_variate_standard_error = None
+        if all(option.control_variate_option_price is not None for option in options):
+            merged.control_variate_option_price, pooled_variance = _pooled_moments(
+                counts,
+                [option.control_variate_option_price for option in options],
+                [option.control_variate_standard_error ** 2 * option.number_simulations for option in options])
+            merged.control_variate_standard_error = sqrt(pooled_variance / number_simulations)
+            merged.control_variate_coefficient = np.average(
+                [option.control_variate_coefficient for option in options], weights=counts)
+
+        return merged
+
+
+class RealOption(_LSMResult):
+    """
+    Least-Squares Monte Carlo value of a real option - the real option (ROV), net present (NPV) and waiting option (WOV) values
+    with their standard errors, exercise statistics and the (lazily evaluated) expected payback of the investment.
+    """
+
+    __slots__ = (
+        "ROV", "NPV", "WOV", "ROV_SE", "NPV_SE", "WOV_SE",
+        "_net_cash_flow", "_capital_expenditure", "_construction_periods", "_backend", "_payback",
+    )
+
+    _PATH_ARRAYS = ("_exercise_timings", "_net_cash_flow", "_capital_expenditure")
 
-        # Exercise timings and cumulative exercise probability:
-        unique, counts = np.unique(exercise_time, return_counts=True)
-        all_time_steps = np.arange(0, time_step * number_periods, time_step)
-        exercise_probability = pd.DataFrame(index=all_time_steps)
-        exercise_probability.loc[unique, 'counts'] = counts
-
-        self.exercise_probability_cumulative = np.cumsum(exercise_probability['counts'].fillna(0) / number_simulations)
-
-        def __repr__(self):
-            if self.call_option:
-                option = "call"
-            else:
-                option = "put"
-            return f"American {option} option: {self.american_option_value:.2f} ({self.standard_error})"
-        
-        def __str__(self):
-            if self.call_option:
-                option = "call"
-            else:
-                option = "put"
-            return f"American {option} option: {self.american_option_value:.2f} ({self.standard_error})"
-
-class RealOption():
     def __init__(
-            self, 
+            self,
             profit,
             real_option_value,
-            exercise_timings, 
+            exercise_timings,
             net_cash_flow,
             capital_expenditure,
             construction_periods,
-            number_simulations, 
+            number_simulations,
             number_periods,
-            time_step
+            time_step,
+            backend="numpy"
             ):
 
         # Investment Values:
@@ -85,75 +324,112 @@ class RealOption():
         self.WOV = self.ROV - self.NPV
 
         # Simulation Standard Errors:
-        from math import sqrt
-        self.ROV_SE = sqrt(variance(real_option_value) / number_simulations)
-        self.NPV_SE = sqrt(variance(profit[0,]) / number_simulations)
-        self.WOV_SE = sqrt(variance(real_option_value - profit[0,]) / number_simulations)
+        self.ROV_SE = _standard_error(real_option_value, number_simulations)
+        self.NPV_SE = _standard_error(profit[0,], number_simulations)
+        self.WOV_SE = _standard_error(real_option_value - profit[0,], number_simulations)
 
-        # American option value - discounting payoffs back to time zero, averaging over all paths.
-        exercised = ~np.isnan(exercise_timings)
-        exercise_period = exercise_timings[exercised].astype(int)
+        # Exercise timings:
+        self._exercise_statistics(exercise_timings, number_simulations, number_periods, time_step)
 
-        # Execise time:
-        exercise_time = exercise_period * time_step
+        # Expected payback period, evaluated upon first access:
+        self._net_cash_flow = net_cash_flow
+        self._capital_expenditure = capital_expenditure
+        self._construction_periods = construction_periods
+        self._backend = backend
+        self._payback = None
 
-        # Expected exercise time
-        self.expected_exercise_years = mean(exercise_time) if len(exercise_time) > 0 else None
+        ## Validation:
+        # real_option_value[exercised] = profit[exercise_period,exercised] * np.exp(- nominal_interest_rate * exercise_period)
 
-        # Exercise probability:
-        self.exercise_probability = len(exercise_period) / number_simulations
+    def __repr__(self):
+        return (f"Real option: ROV {self.ROV:.2f} ({self.ROV_SE:.4f}), NPV {self.NPV:.2f} ({self.NPV_SE:.4f}), "
+                f"WOV {self.WOV:.2f} ({self.WOV_SE:.4f})")
+
+    @property
+    def expected_payback(self):
+        """
+        Expected time (years) from investment to recovering the capital expenditure, conditional on investment and payback.
+        """
+        return self._evaluate_payback()[0]
+
+    @property
+    def expected_payback_SE(self):
+        return self._evaluate_payback()[1]
 
-        # Exercise timings and cumulative exercise probability:
-        unique, counts = np.unique(exercise_time, return_counts=True)
-        all_time_steps = np.arange(0, time_step * number_periods, time_step)
-        exercise_probability = pd.DataFrame(index=all_time_steps)
-        exercise_probability.loc[unique, 'counts'] = counts
+    @property
+    def expected_payback_probability(self):
+        """
+        Probability of recovering the capital expenditure, conditional on investment.
+        """
+        return self._evaluate_payback()[2]
+
+    def _evaluate(self):
+        super()._evaluate()
+        self._evaluate_payback()
+
+    def _evaluate_payback(self):
+        if self._payback is not None:
+            return self._payback
+
+        exercise_timings = self._exercise_timings
+        exercise_period = exercise_timings[~np.isnan(exercise_timings)].astype(np.intp)
 
-        self.exercise_probability_cumulative = np.cumsum(exercise_probability['counts'].fillna(0) / number_simulations)
-        
         ### Expected Payback Period (Conditional on investment exercised):
-        # Time point at which net cash flows are accrued:
-        benefits_accrued = exercise_period + construction_periods
-        
-        invested_NCF = net_cash_flow[:,exercised]
-        ## TODO: Optimise:
-        ## number_periods << number_simulations, row operations is preferable here:
-        for i in range(len(invested_NCF)):
-            invested_NCF[i, i < benefits_accrued] = 0
-        ## When (if ever) do accrued benefits of investment exceed capital investment?
-        
-        ## TODO: Vectorised CAPEX support:
-        payback_achieved = np.argmax(np.cumsum(invested_NCF, axis=0) > capital_expenditure, axis=0)
-        ## Final check - are the 0's real?
-        ## Payback time from investment to making back capital invesment:
-        payback = (payback_achieved - exercise_period) * time_step
-        
+        payback_achieved = payback_periods(
+            self._net_cash_flow, exercise_timings, self._capital_expenditure, self._construction_periods, backend=self._backend)
+        ## Payback time from investment to making back capital invesment (-1 if never):
+        paid_back = payback_achieved >= 0
+        payback = (payback_achieved - exercise_period) * self.time_step
+
         ## If you invest, and it does make back the initial capital expenditure, it's expected to take this long:
-        payback_boolean = payback >= 0
+        payback_boolean = paid_back & (payback >= 0)
         payed_back = payback_boolean.sum()
         if payed_back > 0:
-            self.expected_payback = mean(payback[payback_boolean])
+            expected_payback = float(np.mean(payback[payback_boolean]))
             ## Corresponding standard error:
-            self.expected_payback_SE = variance(payback[payback_boolean])
+            expected_payback_SE = float(np.var(payback[payback_boolean], ddof=1)) if payed_back > 1 else np.nan
         else:
-            self.expected_payback = np.nan
-            self.expected_payback_SE = np.nan
+            expected_payback = np.nan
+            expected_payback_SE = np.nan
         ## If you invest, you have this probability of making back the initial capital expenditure:
-        self.expected_payback_probability = payed_back / len(payback)
+        expected_payback_probability = payed_back / len(payback) if len(payback) > 0 else np.nan
 
-        ## Validation:
-        # real_option_value[exercised] = profit[exercise_period,exercised] * np.exp(- nominal_interest_rate * exercise_period)
+        self._payback = (expected_payback, expected_payback_SE, expected_payback_probability)
+        return self._payback
+
+    @classmethod
+    def merge(cls, options):
+        """
+        Combine `RealOption` results valued on independent simulations (ie. parallel workers) into a single result.
+
+        Investment values and standard errors are pooled from each result's mean and variance; exercise and payback statistics
+        are weighted by the number of simulations, exercised simulations or paid back simulations of each result.
+        """
+        options = list(options)
+        counts = np.array([option.number_simulations for option in options], dtype=float)
+
+        merged = cls.__new__(cls)
+        exercised = np.round(merged._merge_exercise_statistics(options, counts))
+        number_simulations = merged.number_simulations
+        merged._net_cash_flow = merged._capital_expenditure = merged._backend = None
+        merged._construction_periods = options[0]._construction_periods
+
+        # Investment values and standard errors:
+        for value in ("ROV", "NPV", "WOV"):
+            pooled_mean, pooled_variance = _pooled_moments(
+                counts,
+                [getattr(option, value) for option in options],
+                [getattr(option, value + "_SE") ** 2 * option.number_simulations for option in options])
+            setattr(merged, value, pooled_mean)
+            setattr(merged, value + "_SE", sqrt(pooled_variance / number_simulations))
+
+        # Expected payback (conditional on investment, weighted by paid back simulations):
+        payed_back = np.round(np.nan_to_num(np.array([option.expected_payback_probability for option in options])) * exercised)
+        expected_payback, expected_payback_SE = _pooled_moments(
+            payed_back,
+            [option.expected_payback for option in options],
+            [option.expected_payback_SE for option in options])
+        merged._payback = (expected_payback, expected_payback_SE,
+                           payed_back.sum() / exercised.sum() if exercised.sum() > 0 else np.nan)
 
-        def __repr__(self):
-            if self.call_option:
-                option = "call"
-            else:
-                option = "put"
-            return f"American {option} option: {self.american_option_value:.2f} ({self.standard_error})"
-        
-        def __str__(self):
-            if self.call_option:
-                option = "call"
-            else:
-                option = "put"
-            return f"American {option} option: {self.american_option_value:.2f} ({self.standard_error})"
+        return merged
@@ -0,0 +1,138 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from math import ceil
+from multiprocessing.shared_memory import SharedMemory
+from typing import Callable, List, Optional, Tuple, Union
+
+import numpy as np
+
+from .option_results import AmericanOption, RealOption
+from .random_numbers import default_rng
+
+# __name__ = 'option_pricing.utils.parallel'
+
+OPTIONS = ("american", "real")
+
+
+def partition_simulations(n: int, number_workers: int) -> List[Tuple[int, int]]:
+    """
+    (start, stop) columns of each worker - simulations are split into an even number per worker to preserve antithetic pairs.
+    """
+    number_pairs = ceil(n / 2)
+    pairs, remainder = divmod(number_pairs, number_workers)
+    partition, start = [], 0
+    for worker in range(number_workers):
+        stop = start + 2 * (pairs + (worker < remainder))
+        partition.append((start, stop))
+        start = stop
+    return partition
+
+
+def _identity(state_variables: np.ndarray) -> np.ndarray:
+    return state_variables
+
+
+def _price_partition(
+        option: str,
+        simulator: Callable,
+        simulator_kwargs: dict,
+        option_kwargs: dict,
+        payoff: Callable,
+        seed_sequence: np.random.SeedSequence,
+        bit_generator: str,
+        columns: Tuple[int, int],
+        shared_memory: Optional[Tuple[str, Tuple[int, int], np.dtype]],
+) -> Union[AmericanOption, RealOption]:
+
+    # Engines are imported within the worker - they depend upon this package:
+    from ..american_options.monte_carlo_simulation import monte_carlo_simulation as american_monte_carlo_simulation
+    from ..real_options.monte_carlo_simulation import monte_carlo_simulation as real_monte_carlo_simulation
+
+    start, stop = columns
+
+    # Independent, reproducible stream of this partition:
+    state_variables = simulator(n=stop - start, rng=default_rng(seed_sequence, bit_generator), **simulator_kwargs)
+
+    # Write the simulated paths into the shared path cube:
+    if shared_memory is not None:
+        name, shape, dtype = shared_memory
+        assert state_variables.dtype == dtype, f"'simulator' returned {state_variables.dtype} paths, expected {dtype}"
+        block = SharedMemory(name=name)
+        try:
+            np.ndarray(shape, dtype=dtype, buffer=block.buf)[:, start:stop] = state_variables
+        finally:
+            block.close()
+
+    if option == "american":
+        return american_monte_carlo_simulation(
+            state_variables=state_variables, payoff=payoff(state_variables), **option_kwargs)
+    return real_monte_carlo_simulation(
+        state_variables=state_variables, net_cash_flow=payoff(state_variables), **option_kwargs)
+
+
+def parallel_monte_carlo_simulation(
+        simulator: Callable,
+        simulator_kwargs: dict,
+        n: int,
+        option: str = "american",
+        option_kwargs: Optional[dict] = None,
+        payoff: Optional[Callable] = None,
+        number_workers: Optional[int] = None,
+        seed: Optional[int] = None,
+        bit_generator: str = "PCG64",
+        return_state_variables: bool = False,
+):
+    """
+    Least-Squares Monte Carlo valuation of an American (`option="american"`) or real (`option="real"`) option across a process pool.
+
+    The `n` simulations are partitioned across `number_workers` processes. Each partition draws from its own `bit_generator` stream,
+    spawned from `np.random.SeedSequence(seed)`, simulates its paths with `simulator(n=..., **simulator_kwargs)` and is valued independently with
+    the corresponding `monte_carlo_simulation` engine (`option_kwargs` are passed to the engine). `payoff` maps the simulated state
+    variables to the engine's `payoff` (american) or `net_cash_flow` (real) and must be picklable - it defaults to the state variables
+    themselves for American options. Per-partition results are merged through `AmericanOption.merge` / `RealOption.merge`, so the
+    result is deterministic for a given `seed` and `number_workers`.
+
+    With `return_state_variables`, workers write their paths into a shared memory path cube, returned alongside the result. The cube
+    holds the precision of the simulated paths - `simulator_kwargs["dtype"]` (ie. float32), otherwise float64.
+    The `simulator` must accept `t`, `time_step` and `rng` keyword arguments and return (number_steps + 1 x n) arrays.
+    """
+    assert option in OPTIONS, f"'option' must be one of {OPTIONS}"
+    if payoff is None:
+        assert option == "american", "'payoff' mapping state variables to 'net_cash_flow' is required for real options"
+        payoff = _identity
+    if option_kwargs is None:
+        option_kwargs = {}
+    if number_workers is None:
+        number_workers = os.cpu_count() or 1
+    # Every worker simulates at least one antithetic pair:
+    number_workers = max(min(number_workers, ceil(n / 2)), 1)
+
+    partition = partition_simulations(n, number_workers)
+    seed_sequences = np.random.SeedSequence(seed).spawn(number_workers)
+
+    # Shared memory path cube, in the precision of the simulated paths:
+    shared_memory = block = None
+    if return_state_variables:
+        shape = (ceil(simulator_kwargs["t"] / simulator_kwargs["time_step"]) + 1, partition[-1][1])
+        dtype = np.dtype(simulator_kwargs.get("dtype", np.float64))
+        block = SharedMemory(create=True, size=int(np.prod(shape)) * dtype.itemsize)
+        shared_memory = (block.name, shape, dtype)
+
+    try:
+        with ProcessPoolExecutor(max_workers=number_workers) as executor:
+            futures = [
+                executor.submit(_price_partition, option, simulator, simulator_kwargs, option_kwargs,
+                                payoff, seed_sequence, bit_generator, columns, shared_memory)
+                for seed_sequence, columns in zip(seed_sequences, partition)
+            ]
+            results = [future.result() for future in futures]
+
+        merged = (AmericanOption if option == "american" else RealOption).merge(results)
+
+        if return_state_variables:
+            return merged, np.ndarray(shape, dtype=dtype, buffer=block.buf).copy()
+        return merged
+    finally:
+        if block is not None:
+            block.close()
+            block.unlink()
@@ -0,0 +1,130 @@
+import inspect
+import json
+import os
+from math import ceil
+from typing import Callable, Optional, Tuple
+
+import numpy as np
+
+from .random_numbers import default_rng
+
+# __name__ = 'option_pricing.utils.path_store'
+
+# Version of the metadata header:
+PATH_STORE_VERSION = 1
+
+# Time periods copied per chunk when writing a path cube to disk:
+WRITE_CHUNK_PERIODS = 16
+
+
+def path_store_files(filename: str) -> Tuple[str, str]:
+    """
+    (array, metadata) file names of a stored path cube - the `.npy` array and its `.json` metadata header.
+    """
+    root, extension = os.path.splitext(os.fspath(filename))
+    if extension != ".npy":
+        root = os.fspath(filename)
+    return root + ".npy", root + ".json"
+
+
+def _json_default(value):
+    # NumPy scalars and arrays within simulation parameters:
+    if isinstance(value, (np.generic, np.ndarray)):
+        return value.tolist()
+    if isinstance(value, np.dtype) or isinstance(value, type):
+        return np.dtype(value).name
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _write_metadata(filename: str, state_variables: np.ndarray, sde: Optional[str], parameters: Optional[dict], seed) -> dict:
+    metadata = {
+        "version": PATH_STORE_VERSION,
+        "sde": sde,
+        "parameters": {} if parameters is None else dict(parameters),
+        "seed": seed,
+        "dtype": state_variables.dtype.name,
+        "shape": list(state_variables.shape),
+    }
+    with open(path_store_files(filename)[1], "w") as file:
+        json.dump(metadata, file, default=_json_default, indent=2)
+    return metadata
+
+
+def save_paths(
+        filename: str,
+        state_variables: np.ndarray,
+        sde: Optional[str] = None,
+        parameters: Optional[dict] = None,
+        seed: Optional[int] = None,
+) -> np.memmap:
+    """
+    Save a simulated path cube to `filename` (`.npy`) alongside a `.json` metadata header of the SDE, its `parameters`, `seed` and dtype.
+
+    The cube is copied a few time periods at a time, so cubes that are themselves memory mapped are never fully loaded into
+    memory. Returns the stored cube, memory mapped read-only.
+    """
+    state_variables = np.asanyarray(state_variables)
+    array_file, _ = path_store_files(filename)
+
+    stored = np.lib.format.open_memmap(array_file, mode="w+", dtype=state_variables.dtype, shape=state_variables.shape)
+    for start in range(0, state_variables.shape[0], WRITE_CHUNK_PERIODS):
+        stored[start:(start + WRITE_CHUNK_PERIODS)] = state_variables[start:(start + WRITE_CHUNK_PERIODS)]
+    stored.flush()
+    del stored
+
+    _write_metadata(filename, state_variables, sde, parameters, seed)
+    return load_paths(filename)[0]
+
+
+def simulate_paths(
+        filename: str,
+        simulator: Callable,
+        seed: Optional[int] = None,
+        bit_generator: str = "PCG64",
+        **simulator_kwargs,
+) -> np.memmap:
+    """
+    Simulate a path cube with `simulator(rng=..., **simulator_kwargs)` and store it to `filename` for reuse across pricing runs.
+
+    Simulators accepting an `out` array (ie. `geometric_brownian_motion`) simulate directly into the memory mapped file, so the cube
+    need not fit in memory. The `seed` is drawn from fresh entropy when not given and is recorded in the metadata header, so every
+    stored cube can be reproduced. Returns the stored cube, memory mapped read-only.
+    """
+    if seed is None:
+        seed = np.random.SeedSequence().entropy
+    rng = default_rng(seed, bit_generator)
+    sde = f"{simulator.__module__}.{simulator.__qualname__}"
+    parameters = dict(simulator_kwargs, bit_generator=bit_generator)
+
+    if "out" in inspect.signature(simulator).parameters:
+        # Antithetic simulators round the number of paths up to an even number:
+        n = simulator_kwargs["n"]
+        shape = (ceil(simulator_kwargs["t"] / simulator_kwargs["time_step"]) + 1, n + n % 2)
+        array_file, _ = path_store_files(filename)
+        stored = np.lib.format.open_memmap(
+            array_file, mode="w+", dtype=simulator_kwargs.get("dtype", np.float64), shape=shape)
+        simulator(rng=rng, out=stored, **simulator_kwargs)
+        stored.flush()
+        _write_metadata(filename, stored, sde, parameters, seed)
+        del stored
+        return load_paths(filename)[0]
+
+    return save_paths(filename, simulator(rng=rng, **simulator_kwargs), sde=sde, parameters=parameters, seed=seed)
+
+
+def load_paths(
+        filename: str,
+        mmap_mode: Optional[str] = "r",
+) -> Tuple[np.ndarray, dict]:
+    """
+    Load a stored path cube (memory mapped read-only by default - pages are only read from disk as each time slice is used) and
+    its metadata header.
+    """
+    array_file, metadata_file = path_store_files(filename)
+    with open(metadata_file) as file:
+        metadata = json.load(file)
+    assert metadata.get("version") == PATH_STORE_VERSION, f"Unsupported path store version {metadata.get('version')}"
+    state_variables = np.load(array_file, mmap_mode=mmap_mode)
+    assert list(state_variables.shape) == metadata["shape"] and state_variables.dtype.name == metadata["dtype"], \
+        "The stored path cube does not match its metadata header"
+    return state_variables, metadata
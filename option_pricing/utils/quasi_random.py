@@ -0,0 +1,186 @@
+from typing import Optional, Tuple
+
+import numpy as np
+
+from .random_numbers import RandomState, default_rng
+
+# Optional SciPy scrambled Sobol sequences - falls back to a NumPy Sobol generator when SciPy is not installed:
+try:
+    from scipy.stats import qmc
+except ImportError:
+    qmc = None
+
+# __name__ = 'option_pricing.utils.quasi_random'
+
+# Bits of precision of the Sobol sequence (supports up to 2^32 points):
+SOBOL_BITS = 32
+
+# Joe & Kuo (2008) primitive polynomials (degree, coefficients) and initial direction numbers of Sobol dimensions 2-21
+# (dimension 1 is the van der Corput sequence):
+SOBOL_DIRECTIONS = (
+    (1, 0, (1,)),
+    (2, 1, (1, 3)),
+    (3, 1, (1, 3, 1)),
+    (3, 2, (1, 1, 1)),
+    (4, 1, (1, 1, 3, 3)),
+    (4, 4, (1, 3, 5, 13)),
+    (5, 2, (1, 1, 5, 5, 17)),
+    (5, 4, (1, 1, 5, 5, 5)),
+    (5, 7, (1, 1, 7, 11, 19)),
+    (5, 11, (1, 1, 5, 1, 1)),
+    (5, 13, (1, 1, 1, 3, 11)),
+    (5, 14, (1, 3, 5, 5, 31)),
+    (6, 1, (1, 3, 3, 9, 7, 49)),
+    (6, 13, (1, 1, 1, 15, 21, 21)),
+    (6, 16, (1, 3, 1, 13, 27, 49)),
+    (6, 19, (1, 1, 1, 15, 7, 5)),
+    (6, 22, (1, 3, 1, 15, 13, 25)),
+    (6, 25, (1, 1, 5, 5, 19, 61)),
+    (7, 1, (1, 3, 7, 11, 23, 15, 103)),
+    (7, 4, (1, 3, 7, 13, 13, 15, 69)),
+)
+MAXIMUM_SOBOL_DIMENSIONS = len(SOBOL_DIRECTIONS) + 1
+
+
+def _direction_numbers(dimensions: int) -> np.ndarray:
+    # (dimensions x bits) direction numbers, v_k = m_k 2^(bits - k):
+    directions = np.empty((dimensions, SOBOL_BITS), dtype=np.uint64)
+    directions[0] = 1 << np.arange(SOBOL_BITS - 1, -1, -1, dtype=np.uint64)
+    for dimension in range(1, dimensions):
+        degree, coefficients, initial = SOBOL_DIRECTIONS[dimension - 1]
+        v = [int(m) << (SOBOL_BITS - k) for k, m in enumerate(initial, start=1)]
+        for k in range(degree, SOBOL_BITS):
+            value = v[k - degree] ^ (v[k - degree] >> degree)
+            for j in range(1, degree):
+                if (coefficients >> (degree - 1 - j)) & 1:
+                    value ^= v[k - j]
+            v.append(value)
+        directions[dimension] = v[:SOBOL_BITS]
+    return directions
+
+
+def _parity(x: np.ndarray) -> np.ndarray:
+    for shift in (32, 16, 8, 4, 2, 1):
+        x = x ^ (x >> np.uint64(shift))
+    return x & np.uint64(1)
+
+
+def _linear_matrix_scramble(directions: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    # Random lower triangular (unit diagonal) binary matrix applied to the bits of every direction number, most significant first:
+    scrambled = np.zeros_like(directions)
+    for dimension in range(directions.shape[0]):
+        rows = rng.integers(0, 2, size=(SOBOL_BITS, SOBOL_BITS), dtype=np.uint64)
+        rows = np.tril(rows, -1) + np.eye(SOBOL_BITS, dtype=np.uint64)
+        # Row r of the matrix as a mask over bit positions (bit SOBOL_BITS - 1 - c for column c):
+        masks = (rows << np.arange(SOBOL_BITS - 1, -1, -1, dtype=np.uint64)).sum(axis=1, dtype=np.uint64)
+        for row, mask in enumerate(masks):
+            scrambled[dimension] |= _parity(directions[dimension] & mask) << np.uint64(SOBOL_BITS - 1 - row)
+    return scrambled
+
+
+def _sobol_points(n: int, dimensions: int, rng: Optional[np.random.Generator], skip: int) -> np.ndarray:
+    directions = _direction_numbers(dimensions)
+    shift = np.zeros(dimensions, dtype=np.uint64)
+    if rng is not None:
+        directions = _linear_matrix_scramble(directions, rng)
+        shift = rng.integers(0, 2 ** SOBOL_BITS, size=dimensions, dtype=np.uint64)
+
+    # Gray code ordering, x_i = XOR of the direction numbers of the set bits of gray(i):
+    index = np.arange(skip, skip + n, dtype=np.uint64)
+    gray = index ^ (index >> np.uint64(1))
+    points = np.broadcast_to(shift, (n, dimensions)).copy()
+    for bit in range(int(skip + n).bit_length()):
+        selected = ((gray >> np.uint64(bit)) & np.uint64(1)).astype(bool)
+        points[selected] ^= directions[:, bit]
+
+    # Centre of each cell, (0, 1):
+    return (points.astype(np.float64) + 0.5) / 2.0 ** SOBOL_BITS
+
+
+def sobol_sequence(
+        n: int,
+        dimensions: int,
+        rng: RandomState = None,
+        scramble: bool = True,
+) -> np.ndarray:
+    """
+    (n x dimensions) points of a Sobol low-discrepancy sequence in (0, 1).
+
+    With `scramble`, the sequence is randomised (linear matrix scrambling and a digital shift) from `rng`, so independent
+    randomisations give unbiased estimates whose spread estimates the quasi-Monte Carlo error. Uses `scipy.stats.qmc.Sobol` when
+    SciPy is installed. Otherwise the first `MAXIMUM_SOBOL_DIMENSIONS` dimensions are generated from Joe-Kuo direction numbers and
+    any further dimensions are padded with pseudo-random uniforms - ordering dimensions by importance (ie. through a Brownian bridge)
+    keeps the low-discrepancy dimensions where they matter. Powers of two `n` preserve the balance properties of the sequence.
+    """
+    rng = default_rng(rng) if scramble else None
+
+    if qmc is not None:
+        points = qmc.Sobol(dimensions, scramble=scramble, seed=rng).random(n)
+        # Unscrambled sequences begin at the origin:
+        return points if scramble else np.clip(points, 0.5 / 2.0 ** SOBOL_BITS, None)
+
+    sobol_dimensions = min(dimensions, MAXIMUM_SOBOL_DIMENSIONS)
+    points = np.empty((n, dimensions))
+    points[:, :sobol_dimensions] = _sobol_points(n, sobol_dimensions, rng, skip=0)
+    if dimensions > sobol_dimensions:
+        padding = rng if rng is not None else default_rng(0)
+        points[:, sobol_dimensions:] = padding.random((n, dimensions - sobol_dimensions))
+        np.clip(points[:, sobol_dimensions:], 0.5 / 2.0 ** SOBOL_BITS, None, out=points[:, sobol_dimensions:])
+    return points
+
+
+def brownian_bridge_order(number_steps: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Construction order of a Brownian bridge over `number_steps` steps - the terminal value first, then recursive midpoints.
+
+    Returns the (bridge, left, right) step indices of each construction, where `left` is -1 for the origin.
+    """
+    constructed = np.zeros(number_steps, dtype=bool)
+    bridge, left, right = (np.empty(number_steps, dtype=int) for _ in range(3))
+    bridge[0], left[0], right[0] = number_steps - 1, -1, -1
+    constructed[-1] = True
+    j = 0
+    for i in range(1, number_steps):
+        # Next unconstructed run [j, k):
+        while constructed[j]:
+            j += 1
+        k = j
+        while not constructed[k]:
+            k += 1
+        midpoint = j + (k - 1 - j) // 2
+        constructed[midpoint] = True
+        bridge[i], left[i], right[i] = midpoint, j - 1, k
+        j = k + 1
+        if j >= number_steps:
+            j = 0
+    return bridge, left, right
+
+
+def brownian_bridge(
+        normals: np.ndarray,
+        time_step: float,
+        out: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """
+    Brownian motion W(t_1), ..., W(t_m) at t_k = k time_step from (number_steps x paths) standard normals, consumed in Brownian
+    bridge order - the first row sets the terminal value, subsequent rows recursively fill the midpoints. Output is time-major,
+    (number_steps x paths).
+    """
+    number_steps = normals.shape[0]
+    if out is None:
+        out = np.empty(normals.shape, dtype=normals.dtype)
+    bridge, left, right = brownian_bridge_order(number_steps)
+    times = time_step * np.arange(1, number_steps + 1)
+
+    out[-1] = normals[0] * np.sqrt(times[-1])
+    for i in range(1, number_steps):
+        l, j, k = bridge[i], left[i], right[i]
+        t_left = times[j] if j >= 0 else 0.0
+        span = times[k] - t_left
+        right_weight = (times[l] - t_left) / span
+        standard_deviation = np.sqrt((times[l] - t_left) * (times[k] - times[l]) / span)
+        np.multiply(out[k], right_weight, out=out[l])
+        if j >= 0:
+            out[l] += (1 - right_weight) * out[j]
+        out[l] += standard_deviation * normals[i]
+    return out
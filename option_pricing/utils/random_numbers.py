@@ -0,0 +1,51 @@
+from typing import Optional, Tuple, Union
+
+import numpy as np
+
+# __name__ = 'option_pricing.utils.random_numbers'
+
+# Available bit generators:
+BIT_GENERATORS = {
+    "PCG64": np.random.PCG64,
+    "PHILOX": np.random.Philox,
+    "SFC64": np.random.SFC64,
+}
+
+RandomState = Optional[Union[np.random.Generator, np.random.SeedSequence, int]]
+
+
+def default_rng(
+        seed: RandomState = None,
+        bit_generator: str = "PCG64",
+) -> np.random.Generator:
+    """
+    A `numpy.random.Generator` from a seed (or `SeedSequence`), using the `bit_generator` "PCG64" (default), "Philox" or "SFC64".
+    Existing generators are returned unchanged.
+    """
+    if isinstance(seed, np.random.Generator):
+        return seed
+    assert bit_generator.upper() in BIT_GENERATORS, f"'bit_generator' must be one of {list(BIT_GENERATORS)}"
+    return np.random.Generator(BIT_GENERATORS[bit_generator.upper()](seed))
+
+
+def normal_shocks(
+        rng: RandomState,
+        shape: Tuple[int, ...],
+        scale: float,
+        out: Optional[np.ndarray] = None,
+        dtype: np.dtype = np.float64,
+) -> np.ndarray:
+    """
+    Normally distributed shocks with mean zero and standard deviation `scale`.
+
+    Given a generator (or seed), standard normals are drawn with the ziggurat sampler directly into `out` (when supplied, it must be
+    C-contiguous) and scaled in place, in `dtype` (float64 or float32). Without one (`rng=None`), shocks are drawn from the legacy
+    global `np.random` state.
+    """
+    if rng is None:
+        return np.random.normal(scale=scale, size=int(np.prod(shape))).reshape(shape).astype(dtype, copy=False)
+
+    shocks = default_rng(rng).standard_normal(
+        size=None if out is not None else shape, dtype=dtype if out is None else out.dtype, out=out)
+    shocks *= scale
+    return shocks
@@ -0,0 +1,154 @@
+import hashlib
+import inspect
+import json
+import os
+from collections import OrderedDict
+from typing import Callable, Optional
+
+import numpy as np
+
+from .path_store import _json_default, load_paths, path_store_files, simulate_paths
+from .random_numbers import BIT_GENERATORS, default_rng
+
+# __name__ = 'option_pricing.utils.simulation_cache'
+
+# Default in-memory budget (bytes):
+DEFAULT_MAXIMUM_BYTES = 2 ** 30
+# Memory mapped (on-disk) simulations held open at a time:
+MAXIMUM_MAPPED_ENTRIES = 128
+
+# Simulator arguments that do not change the simulated paths - left out of the cache key (Numba and NumPy backends agree to
+# rounding, paths are drawn from the same stream regardless of the block size):
+PATH_INVARIANT_PARAMETERS = ("rng", "out", "backend", "block_size")
+# Arguments that only change the paths away from their default (ie. deterministic shocks):
+DEFAULT_INVARIANT_PARAMETERS = {"testing": False}
+
+
+class SimulationCache():
+    """
+    Content-addressed cache of simulated path cubes.
+
+    Paths are keyed by a SHA-256 hash of the simulator, its full parameter set (defaults included), the bit generator and the seed,
+    so identical scenarios are simulated once and later requests are a dictionary lookup. Arguments that do not change the paths
+    (ie. `backend`) are not hashed. Cached arrays are read-only. The in-memory tier holds at most `maximum_bytes` of paths, evicting
+    the least recently used. With a `directory`, simulations are instead stored there through the path store and memory mapped -
+    surviving restarts. Memory mapped paths are paged in by the operating system and do not count against `maximum_bytes`; at most
+    `MAXIMUM_MAPPED_ENTRIES` of them are held open, evicting the least recently used.
+    """
+
+    def __init__(
+            self,
+            maximum_bytes: int = DEFAULT_MAXIMUM_BYTES,
+            directory: Optional[str] = None,
+    ):
+        assert maximum_bytes >= 0, "'maximum_bytes' must be non-negative"
+        self.maximum_bytes = maximum_bytes
+        self.directory = directory
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+        self._paths = OrderedDict()
+        self._mapped_paths = OrderedDict()
+        self.number_bytes = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._paths) + len(self._mapped_paths)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._paths or key in self._mapped_paths
+
+    def key(
+            self,
+            simulator: Callable,
+            seed: int,
+            bit_generator: str = "PCG64",
+            **simulator_kwargs,
+    ) -> str:
+        """
+        Cache key (hex digest) of a simulation.
+        """
+        arguments = inspect.signature(simulator).bind_partial(**simulator_kwargs)
+        arguments.apply_defaults()
+        parameters = {
+            name: value for name, value in arguments.arguments.items()
+            if name not in PATH_INVARIANT_PARAMETERS
+            and not (name in DEFAULT_INVARIANT_PARAMETERS and value == DEFAULT_INVARIANT_PARAMETERS[name])
+        }
+        content = {
+            "sde": f"{simulator.__module__}.{simulator.__qualname__}",
+            "parameters": parameters,
+            "bit_generator": bit_generator.upper(),
+            "seed": seed,
+        }
+        return hashlib.sha256(json.dumps(content, sort_keys=True, default=_json_default).encode()).hexdigest()
+
+    def simulate(
+            self,
+            simulator: Callable,
+            seed: int,
+            bit_generator: str = "PCG64",
+            **simulator_kwargs,
+    ) -> np.ndarray:
+        """
+        Read-only paths of `simulator(rng=default_rng(seed, bit_generator), **simulator_kwargs)`, simulated upon a cache miss only.
+        """
+        assert seed is not None, "Only seeded simulations can be cached"
+        assert bit_generator.upper() in BIT_GENERATORS, f"'bit_generator' must be one of {list(BIT_GENERATORS)}"
+        key = self.key(simulator, seed, bit_generator, **simulator_kwargs)
+
+        # In-memory tier:
+        for tier in (self._paths, self._mapped_paths):
+            if key in tier:
+                self.hits += 1
+                tier.move_to_end(key)
+                return tier[key]
+
+        # On-disk tier - memory mapped, outside of the in-memory budget:
+        if self.directory is not None:
+            filename = os.path.join(self.directory, key)
+            if all(os.path.exists(file) for file in path_store_files(filename)):
+                self.disk_hits += 1
+                paths, _ = load_paths(filename)
+            else:
+                self.misses += 1
+                paths = simulate_paths(filename, simulator, seed=seed, bit_generator=bit_generator, **simulator_kwargs)
+            self._insert_mapped(key, paths)
+            return paths
+
+        self.misses += 1
+        paths = simulator(rng=default_rng(seed, bit_generator), **simulator_kwargs)
+        paths.flags.writeable = False
+        self._insert(key, paths)
+        return paths
+
+    def _insert_mapped(self, key: str, paths: np.ndarray) -> None:
+        self._mapped_paths[key] = paths
+        # Least recently used eviction (closing the mapping once unreferenced):
+        while len(self._mapped_paths) > MAXIMUM_MAPPED_ENTRIES:
+            self._mapped_paths.popitem(last=False)
+
+    def _insert(self, key: str, paths: np.ndarray) -> None:
+        # Paths larger than the whole budget are not held in memory:
+        if paths.nbytes > self.maximum_bytes:
+            return
+        self._paths[key] = paths
+        self.number_bytes += paths.nbytes
+        # Least recently used eviction:
+        while self.number_bytes > self.maximum_bytes:
+            _, evicted = self._paths.popitem(last=False)
+            self.number_bytes -= evicted.nbytes
+
+    def clear(self) -> None:
+        """
+        Empty the in-memory tier, close memory mapped paths and reset the counters (stored paths remain on disk).
+        """
+        self._paths.clear()
+        self._mapped_paths.clear()
+        self.number_bytes = self.hits = self.disk_hits = self.misses = 0
+
+    def __repr__(self):
+        return (f"SimulationCache(entries={len(self._paths)}, mapped={len(self._mapped_paths)}, "
+                f"bytes={self.number_bytes}/{self.maximum_bytes}, "
+                f"hits={self.hits}, disk_hits={self.disk_hits}, misses={self.misses})")
@@ -0,0 +1,188 @@
+import tracemalloc
+from time import perf_counter
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple, Union
+
+import numpy as np
+
+# __name__ = 'option_pricing.utils.trace'
+
+
+def _reset_peak():
+    # Peak traced memory is only resettable from Python 3.9 - earlier peaks are of the whole run:
+    if hasattr(tracemalloc, "reset_peak"):
+        tracemalloc.reset_peak()
+
+
+class PeriodTrace(NamedTuple):
+    # Period of the backwards induction - None for the phases outside of it (ie. immediate profit and results):
+    period: Optional[int]
+    # Phase -> wall time (seconds):
+    timings: Dict[str, float]
+    number_in_the_money: Optional[int] = None
+    # (in-the-money paths x regressors) of the regression matrix, if regressed:
+    regression_shape: Optional[Tuple[int, int]] = None
+    condition_number: Optional[float] = None
+    # Peak bytes allocated within the period, if allocations are traced:
+    allocated: Optional[int] = None
+
+
+class LSMTrace():
+    """
+    Per-phase instrumentation of the LSM engines - pass `trace=LSMTrace(...)` (or `trace=True`, or a callback) to
+    `monte_carlo_simulation`, and the trace is returned as the `trace` of the result.
+
+    Each period of the backwards induction records the wall time of each phase, the number of in-the-money paths, the shape and
+    condition number of the regression matrix and, with `allocations`, the peak bytes allocated (traced by `tracemalloc`, which is
+    started if not already tracing). Phases of each period, in order:
+
+        payoff           immediate payoff of exercise (American options)
+        in_the_money     discount of every path, in-the-money paths (and their continuation values)
+        gather           state variables of the in-the-money paths - cast, NA check and shift / scale of the basis
+        basis            regression matrix
+        least_squares    regression coefficients
+        scatter          fitted continuation values of the in-the-money paths
+        exercise         exercise decision, option values and timings
+
+    Phases outside of the backwards induction - payoff (terminal), immediate_profit (real options), control_variate and results -
+    are recorded as a final record of period None. `callback` is called with each `PeriodTrace` as it is recorded (ie. to export
+    metrics). A trace holds the records of its latest pricing run.
+    """
+
+    def __init__(
+            self,
+            callback: Optional[Callable[[PeriodTrace], None]] = None,
+            condition_number: bool = True,
+            allocations: bool = False,
+    ):
+        self.callback = callback
+        self.condition_number = condition_number
+        self.allocations = allocations
+        self.periods: List[PeriodTrace] = []
+        self._start_tracing = False
+        self._clear()
+        self._setup = {}
+
+    def _clear(self):
+        self._period = None
+        self._timings = {}
+        self._regression_shape = self._condition_number = None
+        self._lap = perf_counter()
+
+    def __getstate__(self):
+        # Callbacks (ie. exporters) are not pickled:
+        return dict(self.__dict__, callback=None)
+
+    def __repr__(self):
+        return f"LSMTrace: {len(self.periods)} records, " + ", ".join(
+            f"{phase} {seconds:.4f}s" for phase, seconds in self.timings.items())
+
+    @property
+    def timings(self) -> Dict[str, float]:
+        """
+        Total wall time (seconds) of each phase.
+        """
+        timings = {}
+        for record in self.periods:
+            for phase, seconds in record.timings.items():
+                timings[phase] = timings.get(phase, 0.0) + seconds
+        return timings
+
+    def start(self):
+        # Begin a pricing run - the trace holds the records of the latest run:
+        self.periods = []
+        self._setup = {}
+        if self.allocations and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._start_tracing = True
+        if self.allocations:
+            _reset_peak()
+        self._clear()
+
+    def mark(self, phase: str):
+        # Attribute the wall time since the previous mark to `phase`:
+        lap = perf_counter()
+        self._timings[phase] = self._timings.get(phase, 0.0) + lap - self._lap
+        self._lap = lap
+
+    def start_period(self, period: int):
+        # Phases marked before the backwards induction:
+        if self._period is None and self._timings:
+            self._setup.update(self._timings)
+        self._clear()
+        self._period = period
+        if self.allocations:
+            _reset_peak()
+
+    def regression(self, X: np.ndarray):
+        # Shape and (2-norm) condition number of the regression matrix - excluded from the timed phases:
+        self._regression_shape = X.shape
+        if self.condition_number:
+            self._condition_number = float(np.linalg.cond(X.astype(np.float64, copy=False))) if X.shape[0] > 0 else np.inf
+        self._lap = perf_counter()
+
+    def _record(self, record: PeriodTrace):
+        self.periods.append(record)
+        if self.callback is not None:
+            self.callback(record)
+
+    def end_period(self, number_in_the_money: int):
+        self._record(PeriodTrace(
+            period=self._period,
+            timings=self._timings,
+            number_in_the_money=int(number_in_the_money),
+            regression_shape=self._regression_shape,
+            condition_number=self._condition_number,
+            allocated=tracemalloc.get_traced_memory()[1] if self.allocations else None))
+        self._clear()
+
+    def finish(self):
+        # Record the phases outside of the backwards induction:
+        self._setup.update(self._timings)
+        self._record(PeriodTrace(
+            period=None,
+            timings=self._setup,
+            allocated=tracemalloc.get_traced_memory()[1] if self.allocations else None))
+        self._setup = {}
+        self._clear()
+        if self._start_tracing:
+            tracemalloc.stop()
+            self._start_tracing = False
+
+
+class _NullTrace():
+    # Disabled instrumentation - every hook is a no-op:
+
+    def start(self):
+        pass
+
+    def mark(self, phase):
+        pass
+
+    def start_period(self, period):
+        pass
+
+    def regression(self, X):
+        pass
+
+    def end_period(self, number_in_the_money):
+        pass
+
+    def finish(self):
+        pass
+
+
+NULL_TRACE = _NullTrace()
+
+
+def get_trace(trace: Union[None, bool, Callable, LSMTrace]) -> Union[LSMTrace, _NullTrace]:
+    """
+    Instrumentation of an LSM engine - `trace` is None / False (disabled), True, a callback of each `PeriodTrace`, or an `LSMTrace`.
+    """
+    if trace is None or trace is False:
+        return NULL_TRACE
+    if isinstance(trace, (LSMTrace, _NullTrace)):
+        return trace
+    if trace is True:
+        return LSMTrace()
+    assert callable(trace), "'trace' must be a boolean, a callback or an 'LSMTrace'"
+    return LSMTrace(callback=trace)
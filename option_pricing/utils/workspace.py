@@ -0,0 +1,83 @@
+import numpy as np
+
+# __name__ = 'option_pricing.utils.workspace'
+
+
+class LSMWorkspace():
+    """
+    Preallocated buffers for the LSM backward induction.
+
+    Buffers are sized to the number of simulated paths and reused at every period (and across pricing runs when the
+    same workspace is passed to the engines), so the steady-state backward induction loop does not allocate path-sized
+    arrays. Buffers only grow - `reserve` reallocates when a larger simulation is priced, or when the floating point
+    `dtype` (float64 or float32) of the buffers changes.
+    """
+
+    def __init__(
+            self,
+            number_simulations: int = 0,
+            number_state_variables: int = 1,
+            number_regressors: int = 0,
+            dtype: np.dtype = np.float64,
+    ):
+        self.number_simulations = 0
+        self.number_state_variables = 0
+        self.number_regressors = 0
+        self.dtype = np.dtype(dtype)
+        self.reserve(number_simulations, number_state_variables, number_regressors)
+
+    def reserve(
+            self,
+            number_simulations: int,
+            number_state_variables: int,
+            number_regressors: int,
+            dtype: np.dtype = None,
+    ) -> "LSMWorkspace":
+
+        # Change of precision - reallocate every buffer:
+        if dtype is not None and np.dtype(dtype) != self.dtype:
+            self.dtype = np.dtype(dtype)
+            self.number_simulations = 0
+
+        if number_simulations > self.number_simulations:
+            self.number_simulations = number_simulations
+            # Per-path values:
+            self.continuation_value = np.empty(number_simulations, dtype=self.dtype)
+            self.fitted_values = np.empty(number_simulations, dtype=self.dtype)
+            self.continuation_value_in_the_money = np.empty(number_simulations, dtype=self.dtype)
+            self.profit_in_the_money = np.empty(number_simulations, dtype=self.dtype)
+            # Masks:
+            self.in_the_money_paths = np.empty(number_simulations, dtype=bool)
+            self.exercise = np.empty(number_simulations, dtype=bool)
+            # Path indices - all paths, and the compacted in-the-money and exercised paths of a period:
+            self.path_index = np.arange(number_simulations)
+            self.in_the_money_index = np.empty(number_simulations, dtype=np.intp)
+            self.exercised_index = np.empty(number_simulations, dtype=np.intp)
+            # Scratch columns of the regression basis:
+            self._scratch = np.empty(number_simulations * 2, dtype=self.dtype)
+            # Force reallocation of the 2-d buffers:
+            self.number_state_variables = self.number_regressors = 0
+
+        if number_state_variables > self.number_state_variables:
+            self.number_state_variables = number_state_variables
+            self._state_variables_in_the_money = np.empty(
+                self.number_simulations * number_state_variables, dtype=self.dtype)
+
+        if number_regressors > self.number_regressors:
+            self.number_regressors = number_regressors
+            self._regression_matrix = np.empty(
+                self.number_simulations * number_regressors, dtype=self.dtype)
+
+        return self
+
+    # 2-d buffers are stored flat, so that the leading rows form a contiguous array of any row count:
+    def state_variables_in_the_money(self, number_paths: int, number_state_variables: int) -> np.ndarray:
+        return self._state_variables_in_the_money[:number_paths * number_state_variables].reshape(
+            (number_paths, number_state_variables))
+
+    def regression_matrix(self, number_paths: int, number_regressors: int) -> np.ndarray:
+        return self._regression_matrix[:number_paths * number_regressors].reshape(
+            (number_paths, number_regressors), order="F")
+
+    def scratch(self, number_paths: int) -> np.ndarray:
+        return self._scratch[:number_paths * 2].reshape((number_paths, 2), order="F")
@@ -14,6 +14,10 @@ setuptools.setup(
     packages=find_packages(),
     python_requires=">=3.6",
     # install_requires=,
+    extras_require={
+        "numba": ["numba"],
+        "pandas": ["pandas"],
+    },
     long_description=long_description,
     long_description_content_type="text/markdown",
 )